@@ -3,10 +3,13 @@
 
 from argparse import ArgumentParser, RawTextHelpFormatter
 
+import numpy as np
+
 from __metadata__ import _COURSE_, _YEAR_, _TITLE_, _PAIR_, _AUTHORS_
 from src.mode_parser import build_mode_subparser, mode1, mode2, mode3
 from src.ada_network import AdaNetwork
 from src.dataset import Dataset
+from src.writer import Writer
 
 _in_ = 0
 _out_ = 1
@@ -19,11 +22,23 @@ def build_parser():
     parser = ArgumentParser(description=description,
                             formatter_class=RawTextHelpFormatter)
     parser.add_argument(
-        '-t', '--threshold', help='Tolerance for weight updates', required=True)
+        '-t', '--threshold', help='Tolerance for weight updates')
+    parser.add_argument(
+        '-l', '--learn', help='Learning rate')
+    parser.add_argument(
+        '-e', '--epoch', help='Maximum number of epochs to train')
+    parser.add_argument(
+        '-L', '--load', help='Load a saved model instead of training (-t, -l and -e are then not required)')
     parser.add_argument(
-        '-l', '--learn', help='Learning rate', required=True)
+        '-S', '--save', help='Save the model to a file')
     parser.add_argument(
-        '-e', '--epoch', help='Maximum number of epochs to train', required=True)
+        '-V', '--validation', help='Ratio of training data held out for early stopping (e.g. 0.2 [20%%])')
+    parser.add_argument(
+        '-T', '--tol', help='Minimum MSE decrease that counts as an improvement')
+    parser.add_argument(
+        '-P', '--patience', help='Epochs without improvement before stopping')
+    parser.add_argument(
+        '-W', '--max_time', help='Maximum training seconds')
 
     return parser
 
@@ -34,9 +49,15 @@ def main():
 
     args = vars(parser.parse_args())
 
-    epoch = float(args['epoch'])
-    threshold = float(args['threshold'])
-    learn = float(args['learn'])
+    # Training settings are only required without a saved model
+    if not args['load']:
+        missing = [k for k in ('threshold', 'learn', 'epoch') if args[k] is None]
+        if missing:
+            parser.error('the following arguments are required: {}'.format(
+                ', '.join('--' + k for k in missing)))
+        epoch = float(args['epoch'])
+        threshold = float(args['threshold'])
+        learn = float(args['learn'])
 
     if args['mode'] == 'mode1':
         shape, train_data, test_data = mode1(args['data'], args['ratio'])
@@ -47,12 +68,35 @@ def main():
     elif args['mode'] == 'mode3':
         shape, train_data, test_data = mode3(args['train'], args['test'])
 
-    network = AdaNetwork(
-        'AdaNetwork', shape[_in_], shape[_out_], learn_rate=learn)
-    print(network)
-
-    network.train(train_data[_in_], train_data[_out_],
-                  max_epoch=epoch, threshold=threshold)
+    if args['load']:
+        network = AdaNetwork.load(args['load'])
+        print(network)
+    else:
+        network = AdaNetwork(
+            'AdaNetwork', shape[_in_], shape[_out_], learn_rate=learn)
+        print(network)
+
+        # Hold out validation data for early stopping
+        validation = None
+        if args['validation']:
+            n = len(train_data[_in_])
+            perm = np.random.permutation(n)
+            k = int(float(args['validation']) * n)
+            if not 0 < k < n:
+                raise ValueError('Invalid validation ratio. Empty train or validation set.')
+            validation = tuple(d[perm[:k]] for d in train_data)
+            train_data = tuple(d[perm[k:]] for d in train_data)
+            print('Validation instances: {} (held out from train)'.format(k))
+
+        network.train(train_data[_in_], train_data[_out_],
+                      max_epoch=epoch, threshold=threshold,
+                      tol=float(args['tol']) if args['tol'] else None,
+                      patience=int(args['patience']) if args['patience'] else None,
+                      validation=validation,
+                      max_time=float(args['max_time']) if args['max_time'] else None)
+
+    if args['save']:
+        network.save(args['save'])
 
     print("Train score:", network.score(
         train_data[_in_], train_data[_out_]))
@@ -61,12 +105,10 @@ def main():
 
     if args['mode'] == 'mode3':
         res = network.classify(test_data[_in_])
-        with open(args['output'], 'w') as fileout:
-            fileout.write('{}\n'.format(' '.join([str(s) for s in shape])))
-            for i in range(len(res)):
-                x = ' '.join([str(x) for x in test_data[_in_][i]])
-                y = ' '.join([str(y) for y in res[i]])
-                fileout.write('{} {}\n'.format(x, y))
+        precision = int(args['precision']) if args['precision'] else None
+        header = ' '.join([str(s) for s in shape])
+        with Writer(args['output'], header=header, precision=precision) as fileout:
+            fileout.write(test_data[_in_], res)
 
 
 if __name__ == "__main__":
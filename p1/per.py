@@ -6,6 +6,7 @@ from argparse import ArgumentParser, RawTextHelpFormatter
 from __metadata__ import _COURSE_, _YEAR_, _TITLE_, _PAIR_, _AUTHORS_
 from src.mode_parser import build_mode_subparser, mode1, mode2, mode3
 from src.dataset import Dataset
+from src.writer import Writer
 from src.per_network import PerNetwork
 
 _in_ = 0
@@ -19,11 +20,15 @@ def build_parser():
     parser = ArgumentParser(description=description,
                             formatter_class=RawTextHelpFormatter)
     parser.add_argument(
-        '-t', '--threshold', help='Tolerance for weight updates', required=True)
+        '-t', '--threshold', help='Tolerance for weight updates')
     parser.add_argument(
-        '-l', '--learn', help='Learning rate', required=True)
+        '-l', '--learn', help='Learning rate')
     parser.add_argument(
-        '-e', '--epoch', help='Maximum number of epochs to train', required=True)
+        '-e', '--epoch', help='Maximum number of epochs to train')
+    parser.add_argument(
+        '-L', '--load', help='Load a saved model instead of training (-t, -l and -e are then not required)')
+    parser.add_argument(
+        '-S', '--save', help='Save the model to a file')
 
     return parser
 
@@ -34,9 +39,15 @@ def main():
 
     args = vars(parser.parse_args())
 
-    epoch = float(args['epoch'])
-    threshold = float(args['threshold'])
-    learn = float(args['learn'])
+    # Training settings are only required without a saved model
+    if not args['load']:
+        missing = [k for k in ('threshold', 'learn', 'epoch') if args[k] is None]
+        if missing:
+            parser.error('the following arguments are required: {}'.format(
+                ', '.join('--' + k for k in missing)))
+        epoch = float(args['epoch'])
+        threshold = float(args['threshold'])
+        learn = float(args['learn'])
 
     if args['mode'] == 'mode1':
         shape, train_data, test_data = mode1(args['data'], args['ratio'])
@@ -47,11 +58,18 @@ def main():
     elif args['mode'] == 'mode3':
         shape, train_data, test_data = mode3(args['train'], args['test'])
 
-    network = PerNetwork(name='PerNetwork', input_length=shape[_in_], output_length=shape[_out_],
-                         theta=threshold, learn_rate=learn)
-    print(network)
+    if args['load']:
+        network = PerNetwork.load(args['load'])
+        print(network)
+    else:
+        network = PerNetwork(name='PerNetwork', input_length=shape[_in_], output_length=shape[_out_],
+                             theta=threshold, learn_rate=learn)
+        print(network)
+
+        network.train(train_data[_in_], train_data[_out_], max_epoch=epoch)
 
-    network.train(train_data[_in_], train_data[_out_], max_epoch=epoch)
+    if args['save']:
+        network.save(args['save'])
 
     print("Train score:", network.score(
         train_data[_in_], train_data[_out_]))
@@ -60,12 +78,10 @@ def main():
 
     if args['mode'] == 'mode3':
         res = network.classify(test_data[_in_])
-        with open(args['output'], 'w') as fileout:
-            fileout.write('{}\n'.format(' '.join([str(s) for s in shape])))
-            for i in range(len(res)):
-                x = ' '.join([str(x) for x in test_data[_in_][i]])
-                y = ' '.join([str(y) for y in res[i]])
-                fileout.write('{} {}\n'.format(x, y))
+        precision = int(args['precision']) if args['precision'] else None
+        header = ' '.join([str(s) for s in shape])
+        with Writer(args['output'], header=header, precision=precision) as fileout:
+            fileout.write(test_data[_in_], res)
 
 
 if __name__ == "__main__":
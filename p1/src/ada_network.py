@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from time import perf_counter
+
 import numpy as np
 
 from src.dataset import btp, ptb
@@ -17,6 +19,9 @@ class AdaNetwork(Network):
     bias = None
     synapses = None
 
+    _settings = ('input_size', 'output_size', 'learn_rate')
+    _arrays = ('synapses', 'bias')
+
     def __init__(self, name, input_size, output_size, learn_rate):
         super(AdaNetwork, self).__init__(name)
         self.input_size = input_size
@@ -27,10 +32,30 @@ class AdaNetwork(Network):
                                           output_size).reshape((output_size, input_size))
 
     def train(self, datain, dataout, max_epoch=__default_max_epoch__,
-              threshold=__default_threshold__):
-
+              threshold=__default_threshold__, tol=None, patience=None,
+              validation=None, max_time=None):
+        """
+        Stops once the largest weight change of an epoch is below threshold or
+        after max_epoch epochs. If any of tol, patience, validation (held-out
+        (datain, dataout)) or max_time (seconds) is given, it also stops once
+        the MSE (on validation, if given) has not improved by more than tol for
+        patience epochs (1 if only tol is given) or time runs out, and then
+        restores the weights with the lowest MSE.
+        """
         dataout_polar = btp(dataout)
 
+        early = any(v is not None for v in (tol, patience, validation, max_time))
+        if early:
+            if tol is not None and patience is None:
+                patience = 1
+            tol = tol or 0.
+            if validation is not None:
+                check_in, check_out = validation[0], btp(validation[1])
+            else:
+                check_in, check_out = datain, dataout_polar
+            best, best_weights, wait = np.inf, None, 0
+            start = perf_counter()
+
         epochs = 0
         delta = np.inf
 
@@ -38,8 +63,26 @@ class AdaNetwork(Network):
             delta = self.train_all_instances(datain, dataout_polar)
             epochs += 1
 
+            if early:
+                error = self.mse(check_in, check_out)
+                wait = 0 if error < best - tol else wait + 1
+                if error < best:
+                    best = error
+                    best_weights = self.synapses.copy(), self.bias.copy()
+                if patience is not None and wait >= patience:
+                    break
+                if max_time is not None and perf_counter() - start >= max_time:
+                    break
+
+        if early and best_weights is not None:
+            self.synapses, self.bias = best_weights
+
         return
 
+    def mse(self, datain, dataout_polar):
+        y_in = np.dot(datain, self.synapses.T) + self.bias
+        return float(np.mean((dataout_polar - y_in) ** 2))
+
     def train_all_instances(self, input_polar, output_polar):
 
         delta = -np.inf
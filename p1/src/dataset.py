@@ -4,6 +4,8 @@
 from copy import deepcopy
 import numpy as np
 
+from src.cache import read
+
 
 class Dataset:
     input_length = None
@@ -13,27 +15,21 @@ class Dataset:
     input_data = None
     output_data = None
 
-    def __init__(self, filename, normalize=False, binary=True):
-        with open(filename, 'r') as file:
-            # Load metadata
-            [len_in, len_out] = file.readline().split()
-            self.input_length = int(len_in)
-            self.output_length = int(len_out)
-
-            # Load dataset
-            data = np.asarray([l.split() for l in file.read().splitlines()])
+    def __init__(self, filename, normalize=False, binary=True, cache=None):
+        # Load metadata and dataset (through the binary cache)
+        self.input_length, self.output_length, data = read(filename, cache=cache)
 
-            self.instance_count = len(data)
+        self.instance_count = len(data)
 
-            self.input_data = data[:, :self.input_length].astype(float)
-            if normalize:
-                min_ = np.min(self.input_data, axis=0)
-                max_ = np.max(self.input_data, axis=0)
-                self.input_data = (self.input_data - min_) / (max_ - min_)
+        self.input_data = data[:, :self.input_length].astype(float)
+        if normalize:
+            min_ = np.min(self.input_data, axis=0)
+            max_ = np.max(self.input_data, axis=0)
+            self.input_data = (self.input_data - min_) / (max_ - min_)
 
-            self.output_data = data[:, self.input_length:].astype(int)
-            if binary:
-                self.output_data = btp(self.output_data)
+        self.output_data = data[:, self.input_length:].astype(int)
+        if binary:
+            self.output_data = btp(self.output_data)
 
     def partition(self, ratio):
         split_index = int(np.floor(ratio * self.instance_count))
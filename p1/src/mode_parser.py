@@ -38,7 +38,9 @@ def build_mode3_parser(subparsers):
     parser.add_argument(
         '-te', '--test', help='Test dataset file', required=True)
     parser.add_argument(
-        '-o', '--output', help='Output file for predictions', required=True)
+        '-o', '--output', help='Output file for predictions (.npy or .raw for binary)', required=True)
+    parser.add_argument(
+        '-p', '--precision', help='Significant digits of predicted values (default: exact)')
 
 
 def mode1(data_file, ratio):
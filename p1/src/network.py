@@ -3,13 +3,39 @@
 
 from abc import ABC, abstractmethod
 
+from src import store
+
 
 class Network(ABC):
     name = None
 
+    # Attributes saved to model files (settings and weight arrays)
+    _settings = ()
+    _arrays = ()
+
     def __init__(self, name):
         self.name = name
 
+    def save(self, filename):
+        header = {'cls': self.__class__.__name__, 'name': self.name}
+        header.update((k, getattr(self, k)) for k in self._settings)
+        store.write(filename, header, [getattr(self, k) for k in self._arrays])
+
+    @classmethod
+    def load(cls, filename):
+        header, arrays = store.read(filename)
+        if header.pop('cls') != cls.__name__:
+            raise ValueError("'{}' is not a {} model file.".format(filename, cls.__name__))
+
+        # Restore attributes without running the constructor (weights are mapped)
+        network = cls.__new__(cls)
+        Network.__init__(network, header.pop('name'))
+        for k in cls._settings:
+            setattr(network, k, header[k])
+        for k, a in zip(cls._arrays, arrays):
+            setattr(network, k, a)
+        return network
+
     def __str__(self):
         header = self.__class__.__name__ + " '{}'".format(self.name)
         bar = '=' * len(header)
@@ -17,6 +17,9 @@ class PerNetwork(Network):
     synapses = None
     bias = None
 
+    _settings = ('input_length', 'output_length', 'theta', 'learn')
+    _arrays = ('synapses', 'bias')
+
     def __init__(self, name, input_length, output_length, theta, learn_rate):
         super(PerNetwork, self).__init__(name)
         self.input_length = input_length
@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+"""Test configuration (makes the `neuro` package importable from the tests).
+"""
@@ -0,0 +1,179 @@
+# !/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Activation (transfer) functions.
+
+Every activation is a pair of array kernels: the function itself and its
+derivative, which is given the function output too so it is not computed
+twice. Both kernels can write their results to preallocated buffers, and
+saturate instead of overflowing. Activations are registered by name (see
+`register` and `get`), which is how nets refer to them (e.g. in model files).
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+# Registered activations by name
+ACTIVATIONS = dict()
+
+
+class Activation(ABC):
+    """Base activation class.
+
+    Attributes:
+        name (str): Registered name.
+    """
+
+    name = None
+
+    @abstractmethod
+    def f(self, y, out=None):
+        """Activation function.
+
+        Args:
+            y (numpy.ndarray): Input signals.
+            out (numpy.ndarray, optional): Defaults to None. Buffer for the outputs (may be `y`).
+
+        Returns:
+            numpy.ndarray: Outputs.
+        """
+
+        pass
+
+    @abstractmethod
+    def df(self, y, z, out=None):
+        """Activation function derivative.
+
+        Args:
+            y (numpy.ndarray): Input signals.
+            z (numpy.ndarray): Outputs for `y` (as returned by `f`).
+            out (numpy.ndarray, optional): Defaults to None. Buffer for the derivatives.
+
+        Returns:
+            numpy.ndarray: Derivatives.
+        """
+
+        pass
+
+
+class Bipolar(Activation):
+    """Bipolar sigmoid, 2 / (1 + exp(-y)) - 1, with values in (-1, 1).
+    """
+
+    name = 'bipolar'
+
+    def f(self, y, out=None):
+        # Same as 2 / (1 + exp(-y)) - 1, but saturates instead of overflowing
+        out = np.multiply(y, 0.5, out=out)
+        return np.tanh(out, out=out)
+
+    def df(self, y, z, out=None):
+        out = np.subtract(1, z, out=out)
+        out *= 1 + z
+        out /= 2
+        return out
+
+
+class Tanh(Activation):
+    """Hyperbolic tangent, with values in (-1, 1).
+    """
+
+    name = 'tanh'
+
+    def f(self, y, out=None):
+        return np.tanh(y, out=out)
+
+    def df(self, y, z, out=None):
+        out = np.subtract(1, z, out=out)
+        out *= 1 + z
+        return out
+
+
+class Identity(Activation):
+    """Identity (linear cells).
+    """
+
+    name = 'identity'
+
+    def f(self, y, out=None):
+        if out is None:
+            return np.array(y, dtype=float)
+        out[...] = y
+        return out
+
+    def df(self, y, z, out=None):
+        if out is None:
+            return np.ones(np.shape(y))
+        out.fill(1)
+        return out
+
+
+class IdentityBipolar(Identity):
+    """Identity, trained with the bipolar sigmoid derivative (as `Series` nets are).
+    """
+
+    name = 'identity-bipolar'
+
+    _bipolar = Bipolar()
+
+    def df(self, y, z, out=None):
+        # Derivative of the bipolar sigmoid at the input signals
+        return self._bipolar.df(y, self._bipolar.f(y), out=out)
+
+
+class ReLU(Activation):
+    """Rectified linear unit, max(0, y).
+    """
+
+    name = 'relu'
+
+    def f(self, y, out=None):
+        return np.maximum(y, 0, out=out)
+
+    def df(self, y, z, out=None):
+        if out is None:
+            out = np.empty(np.shape(y))
+        return np.greater(y, 0, out=out)
+
+
+def register(activation):
+    """Register an activation under its name.
+
+    Args:
+        activation (Activation): Activation to register.
+
+    Raises:
+        ValueError: If its name is already registered.
+
+    Returns:
+        Activation: Registered activation.
+    """
+
+    if activation.name in ACTIVATIONS:
+        raise ValueError('Activation "{}" is already registered.'.format(activation.name))
+    ACTIVATIONS[activation.name] = activation
+    return activation
+
+
+def get(name):
+    """Get a registered activation.
+
+    Args:
+        name (str): Registered name.
+
+    Raises:
+        ValueError: If `name` is not registered.
+
+    Returns:
+        Activation: Activation.
+    """
+
+    if name not in ACTIVATIONS:
+        raise ValueError('Unknown activation "{}" (expected one of: {}).'.format(
+            name, ', '.join(ACTIVATIONS)))
+    return ACTIVATIONS[name]
+
+
+# Register built-in activations
+for _activation in (Bipolar(), Tanh(), Identity(), IdentityBipolar(), ReLU()):
+    register(_activation)
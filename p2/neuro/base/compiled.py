@@ -0,0 +1,182 @@
+# !/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compiled synapses for layered nets.
+"""
+
+from collections.abc import Mapping, MutableMapping
+
+import numpy as np
+
+from neuro.base.net import BIAS_KEY
+
+
+class CompiledSynapses(Mapping):
+    """Dense per-layer synaptic weights behind the `Net._synapses` interface.
+
+    Every weight and bias lives in a single flat buffer. `weights[k]` is the
+    (post x pre) matrix between layers `k` and `k + 1` and `biases[k]` is the
+    bias vector of layer `k`, both being views over that buffer. Indexing by
+    cell name still yields a mapping from pre-synaptic cell names (and
+    `BIAS_KEY`) to weights, so code written against the dict-of-dicts keeps
+    working.
+
+    Attributes:
+        names (list): Layer base names, from input to output.
+        sizes (list): Layer sizes, from input to output.
+        params (numpy.ndarray): Flat buffer with every weight and bias.
+        weights (list): Weight matrices between consecutive layers.
+        biases (list): Bias vectors for every layer.
+    """
+
+    names = None
+    sizes = None
+    params = None
+    weights = None
+    biases = None
+
+    _cells = None
+
+    def __init__(self, names, sizes, buffer=None):
+        """Constructor.
+
+        Args:
+            names (list): Layer base names, from input to output.
+            sizes (list): Layer sizes, from input to output.
+            buffer (optional): Defaults to None. Object exposing the buffer
+                protocol to use as flat storage (a new one is allocated if None).
+
+        Raises:
+            ValueError: If `names` and `sizes` do not match or `buffer` is too small.
+        """
+
+        if len(names) != len(sizes) or len(names) < 2:
+            raise ValueError('Invalid layer names or sizes.')
+        self.names = list(names)
+        self.sizes = list(sizes)
+        # Allocate (or wrap) the flat storage
+        n = self.count(sizes)
+        if buffer is None:
+            self.params = np.zeros(n)
+        else:
+            self.params = np.frombuffer(buffer, dtype=float, count=n)
+        # Carve per-layer views out of the flat storage
+        self.weights = list()
+        self.biases = list()
+        offset = 0
+        for k, size in enumerate(sizes):
+            if k > 0:
+                w = sizes[k - 1] * size
+                self.weights.append(
+                    self.params[offset:offset + w].reshape(size, sizes[k - 1]))
+                offset += w
+            self.biases.append(self.params[offset:offset + size])
+            offset += size
+        # Create one mapping per cell, following the order in which
+        # MLPerceptron adds them (hidden layers, then input, then output)
+        order = list(range(1, len(sizes) - 1)) + [0, len(sizes) - 1]
+        self._cells = dict()
+        for k in order:
+            pre = dict()
+            if k > 0:
+                pre = {'{}{}'.format(names[k - 1], i): i
+                       for i in range(sizes[k - 1])}
+            for j in range(sizes[k]):
+                self._cells['{}{}'.format(names[k], j)] = _CellSynapses(
+                    self.biases[k], self.weights[k - 1] if k > 0 else None, j, pre)
+
+    @staticmethod
+    def count(sizes):
+        """Compute the flat storage length for given layer sizes.
+
+        Args:
+            sizes (list): Layer sizes, from input to output.
+
+        Returns:
+            int: Number of weights and biases.
+        """
+
+        return sum(sizes) + sum(a * b for a, b in zip(sizes, sizes[1:]))
+
+    @classmethod
+    def from_dict(cls, synapses, names, sizes):
+        """Compile a dict-of-dicts of synapses.
+
+        Args:
+            synapses (dict): Synaptic weights as `synapses[post][pre]`.
+            names (list): Layer base names, from input to output.
+            sizes (list): Layer sizes, from input to output.
+
+        Raises:
+            LookupError: If `synapses` do not connect consecutive layers only.
+
+        Returns:
+            CompiledSynapses: Compiled synapses.
+        """
+
+        compiled = cls(names, sizes)
+        for post, d in synapses.items():
+            if post not in compiled:
+                raise LookupError(
+                    'Cell "{}" is not part of a layer.'.format(post))
+            for pre, w in d.items():
+                compiled[post][pre] = w
+        return compiled
+
+    def __getitem__(self, name):
+        return self._cells[name]
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __deepcopy__(self, memo):
+        return CompiledSynapses(self.names, self.sizes, self.params.copy())
+
+    def __getstate__(self):
+        return self.names, self.sizes, self.params.copy()
+
+    def __setstate__(self, state):
+        names, sizes, params = state
+        self.__init__(names, sizes, params)
+
+
+class _CellSynapses(MutableMapping):
+    """Ingoing synapses of a single cell, as stored in `CompiledSynapses`.
+    """
+
+    __slots__ = ('_b', '_w', '_j', '_pre')
+
+    def __init__(self, b, w, j, pre):
+        self._b = b
+        self._w = w
+        self._j = j
+        self._pre = pre
+
+    def __getitem__(self, pre):
+        if pre is BIAS_KEY:
+            return float(self._b[self._j])
+        return float(self._w[self._j, self._pre[pre]])
+
+    def __setitem__(self, pre, weight):
+        if pre is BIAS_KEY:
+            self._b[self._j] = weight
+        elif pre in self._pre:
+            self._w[self._j, self._pre[pre]] = weight
+        else:
+            raise LookupError(
+                'Cell "{}" is not in the previous layer.'.format(pre))
+
+    def __delitem__(self, pre):
+        raise LookupError('Synapses cannot be removed from a compiled net.')
+
+    def __iter__(self):
+        yield BIAS_KEY
+        yield from self._pre
+
+    def __len__(self):
+        return len(self._pre) + 1
+
+    def __contains__(self, pre):
+        return pre is BIAS_KEY or pre in self._pre
@@ -4,8 +4,12 @@
 """
 
 from abc import ABC, abstractmethod
+from collections import deque
 from random import uniform
-from statistics import mean, stdev
+
+import numpy as np
+
+from neuro.base.stats import RunningStats
 
 # Use special key None for bias weights
 BIAS_KEY = None
@@ -26,6 +30,8 @@ class Net(ABC):
     _normalize = None
     _μ = None
     _σ = None
+    _stats = None
+    _order = None
 
     def __init__(self, name):
         self.name = name
@@ -36,19 +42,74 @@ class Net(ABC):
         self._μ = list()
         self._σ = list()
 
-    def _dfs(self, c, instance, hist=dict()):
-        """Internal implementation of Depth First Search for cell transfers.
+    def _topology(self):
+        """Get (and cache) the cells of the net in topological order.
+
+        Raises:
+            ValueError: If the net has cyclic synapses.
+
+        Returns:
+            list: Ordered list of cell names, every cell after its pre-synaptic cells.
+        """
+
+        # Reuse cached order if still valid
+        if self._order is not None:
+            return self._order
+        # Count ingoing synapses and collect outgoing ones for every cell
+        pending = dict()
+        posts = {c: list() for c in self._synapses}
+        for c, d in self._synapses.items():
+            pending[c] = 0
+            for pre in d:
+                if pre is not BIAS_KEY:
+                    pending[c] += 1
+                    posts[pre].append(c)
+        # Kahn's algorithm
+        ready = deque(c for c, n in pending.items() if n == 0)
+        order = list()
+        while ready:
+            c = ready.popleft()
+            order.append(c)
+            for post in posts[c]:
+                pending[post] -= 1
+                if pending[post] == 0:
+                    ready.append(post)
+        # Every cell must have been reached
+        if len(order) != len(self._synapses):
+            raise ValueError(
+                'Net "{}" has cyclic synapses.'.format(self.name))
+        # Save order for later runs
+        self._order = order
+        return order
+
+    def _cell(self, c, hist):
+        """Compute a cell transfer from its pre-synaptic cells.
+
+        Args:
+            c (str): Cell name.
+            hist (dict): Value history [in, out], with every pre-synaptic cell already computed.
+
+        Returns:
+            list: Cell values [in, out].
+        """
+
+        # Get bias
+        b = self._synapses[c][BIAS_KEY]
+        # Weighted sum of ingoing synapses
+        s = sum([w * hist[d][1]
+                 for d, w in self._synapses[c].items() if d is not BIAS_KEY])
+        # Return cell values
+        return [b + s, self.f(b + s)]
+
+    def _propagate(self, instance, hist):
+        """Compute every cell transfer exactly once for an instance.
 
         Args:
-            c (str): Final cell name.
             instance (list): Ordered list of values for input layer.
-            hist (dict, optional): Defaults to {}. Value history [in, out].
+            hist (dict): Value history [in, out] to populate.
 
         Raises:
             ValueError: If `instance` is invalid.
-
-        Returns:
-            int: Final cell output value.
         """
 
         # Check that input sizes match
@@ -56,33 +117,21 @@ class Net(ABC):
             raise ValueError('Instance {} does not match input layer size ({}).'.format(
                 instance, len(self._x)))
         # Create dict with input values from instance
-        x = {name: value for name, value in zip(self._x, instance)}
-        # Degenerate case
-        if not c:
-            return 0
-        # If input cell
-        if c in self._x:
-            # Get input value from instance
-            _x = x[c]
+        x = dict()
+        for i, (c, _x) in enumerate(zip(self._x, instance)):
             # If normalization enabled
             if self._normalize:
-                # Get input cell index
-                i = self._x.index(c)
                 # Normalize value
                 _x = (_x - self._μ[i]) / self._σ[i]
-            # Add value to history (duplicated for data consistency)
-            hist[c] = [_x, _x]
-            # Return value
-            return _x
-        # Get bias
-        b = self._synapses[c][BIAS_KEY]
-        # Weighted sum of ingoing synapses
-        s = sum([w * self._dfs(d, instance, hist=hist)
-                 for d, w in self._synapses[c].items() if d is not BIAS_KEY])
-        # Add values to history
-        hist[c] = [b + s, self.f(b + s)]
-        # Return output value
-        return self.f(b + s)
+            x[c] = _x
+        # Compute every cell in topological order
+        for c in self._topology():
+            # If input cell
+            if c in x:
+                # Add value to history (duplicated for data consistency)
+                hist[c] = [x[c], x[c]]
+            else:
+                hist[c] = self._cell(c, hist)
 
     def add_cell(self, basename, i, type=None):
         """Add a new cell to the net.
@@ -103,6 +152,8 @@ class Net(ABC):
                 'Cell "{}" already exists in net "{}".'.format(name, self.name))
         # Initialize cell synapses dict
         self._synapses[name] = dict()
+        # Invalidate topological order
+        self._order = None
         # Initialize bias to 0
         self._synapses[name][BIAS_KEY] = 0
         # Mark as input or output cell, if any
@@ -148,6 +199,9 @@ class Net(ABC):
         if not post in self._synapses:
             raise LookupError(
                 'Cell "{}" does not exist in the net.'.format(post))
+        # Invalidate topological order if the synapse is new
+        if pre not in self._synapses[post]:
+            self._order = None
         # Add synapse to dict
         self._synapses[post][pre] = weight
 
@@ -203,29 +257,61 @@ class Net(ABC):
         # Disable normalization if data is None
         if data is None:
             self._normalize = False
+            self._stats = None
             return
 
-        # Enable normalization
-        self._normalize = True
-        # Watch out for a size mismatch
-        try:
-            # For every input cell
-            for i in range(len(self._x)):
-                # Save mean value
-                self._μ[i] = mean(x[i] for x in data)
-                # Save standard deviation
-                self._σ[i] = stdev(x[i] for x in data)
-        # Catch input size mismatch exceptions
-        except IndexError:
+        # Compute statistics from scratch
+        self.set_normalization(RunningStats(len(self._x)).update(data))
+
+    def update_normalization(self, data):
+        """Update input normalization with new instances.
+
+        Statistics are updated incrementally, so data can be given in chunks
+        (e.g. as it arrives) and earlier instances are not needed again.
+
+        Args:
+            data (list): List of new input instances.
+
+        Raises:
+            ValueError: If `data` is invalid.
+        """
+
+        # Start from current statistics, if any
+        if self._stats is None:
+            stats = RunningStats(len(self._x))
+        else:
+            stats = self._stats.copy()
+        self.set_normalization(stats.update(data))
+
+    def set_normalization(self, stats):
+        """Enable input normalization with given statistics.
+
+        Args:
+            stats (RunningStats): Input statistics (e.g. merged from several shards).
+
+        Raises:
+            ValueError: If `stats` are invalid.
+        """
+
+        # Check that input sizes match
+        if len(stats.mean) != len(self._x):
             raise ValueError(
                 'Input instance size mismatch ({}).'.format(len(self._x)))
+        σ = stats.std()
+        # Constant inputs are only centered
+        σ[σ == 0] = 1
+        # Enable normalization (new lists, so cached input matrices become stale)
+        self._normalize = True
+        self._stats = stats
+        self._μ = stats.mean.tolist()
+        self._σ = σ.tolist()
 
-    def test_instance(self, instance, hist=dict()):
+    def test_instance(self, instance, hist=None):
         """Run the net with an instance as input.
 
         Args:
             instance (list): Ordered list of values for input layer.
-            hist (dict, optional): Defaults to {}. Value history.
+            hist (dict, optional): Defaults to None. Value history [in, out] to populate.
 
         Raises:
             ValueError: If `instance` is invalid.
@@ -234,23 +320,32 @@ class Net(ABC):
             list: Ordered list of values from output layer.
         """
 
-        # Return output layer values after DFS
-        return [self._dfs(y, instance, hist) for y in self._y]
+        # Create history dict if not given
+        if hist is None:
+            hist = dict()
+        # Compute every cell once
+        self._propagate(instance, hist)
+        # Return output layer values
+        return [hist[y][1] for y in self._y]
 
     def test(self, data):
         """Run the net for an ordered list of instances.
 
         Args:
-            data (list): Ordered list of input instances.
+            data (list): Ordered list (or matrix) of input instances.
 
         Raises:
             ValueError: If `data` is invalid.
 
         Returns:
-            list: Ordered list of output instances.
+            numpy.ndarray: Matrix of output instances (one per row).
         """
 
-        return [self.test_instance(instance) for instance in data]
+        # Generic nets can only be run instance by instance
+        results = np.empty((len(data), len(self._y)))
+        for i, instance in enumerate(data):
+            results[i] = self.test_instance(instance)
+        return results
 
     def stats(self, datain, dataout):
         """Gather statistics about test data classification.
@@ -271,27 +366,16 @@ class Net(ABC):
             raise ValueError('Input and output instance counts do not match.')
         # Run test for input data
         results = self.test(datain)
-        # Get number of instances
-        n = len(results)
-        # Initialize score
-        score = 0
-        # Create confussion matrix
-        r = range(len(self._y))
-        m = [[0 for _ in r] for _ in r]
-        # For every instance
-        for T, Y in zip(dataout, results):
-            # Get expected class
-            i = T.index(max(T))
-            # Get predicted class
-            j = Y.index(max(Y))
-            # If correct
-            if i == j:
-                # Add to score
-                score += 1
-            # Accumulate in confussion matrix
-            m[i][j] += 1
+        # Get expected and predicted classes
+        i = np.argmax(np.asarray(dataout), axis=1)
+        j = np.argmax(results, axis=1)
+        # Score is the ratio of correct predictions
+        score = np.count_nonzero(i == j) / len(results)
+        # Accumulate confussion matrix
+        m = np.zeros((len(self._y), len(self._y)), dtype=int)
+        np.add.at(m, (i, j), 1)
         # Return both stats
-        return score/n, m
+        return score, m.tolist()
 
     @abstractmethod
     def train(self, datain, dataout, learn, epochs, normalize=False):
@@ -0,0 +1,650 @@
+# !/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Weight update rules (optimizers).
+
+Every optimizer turns the corrections computed by backpropagation (expected
+minus obtained values, so they already point downhill) into a weight update,
+working in place on the flat parameter vector of a net. Optimizers with
+momentum or adaptive rates keep one state vector per parameter vector, which
+is saved in training checkpoints next to the weights. Optimizers are
+registered by name (see `register` and `create`).
+
+Full-batch optimizers (L-BFGS and nonlinear conjugate gradient) work on the
+loss and its gradient over the whole data instead: every iteration picks a
+search direction and a line search finds how far to move along it.
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+# Registered optimizer classes by name
+OPTIMIZERS = dict()
+
+
+class Optimizer(ABC):
+    """Base optimizer class.
+
+    Attributes:
+        name (str): Registered name.
+        max_learn (float): Largest valid learning rate.
+        full_batch (bool): Whether it needs the loss over the whole data (see `LineSearch`).
+        steps (int): Updates applied so far.
+    """
+
+    name = None
+    max_learn = 1.0
+    full_batch = False
+    steps = None
+
+    def __init__(self, size):
+        """Constructor.
+
+        Args:
+            size (int): Number of parameters to update.
+        """
+
+        self.steps = 0
+
+    def check(self, learn):
+        """Check the learning rate range.
+
+        Args:
+            learn (float): Learning rate.
+
+        Raises:
+            ValueError: If `learn` is out of range for this optimizer.
+        """
+
+        if not 0 < learn <= self.max_learn:
+            raise ValueError('Learning rate must be within the interval (0, {:g}]{}.'.format(
+                self.max_learn, '' if self.name == SGD.name else ' for {}'.format(self.name)))
+
+    @abstractmethod
+    def step(self, params, grad, learn):
+        """Apply an update.
+
+        Args:
+            params (numpy.ndarray): Weights to update in place.
+            grad (numpy.ndarray): Mean corrections (may be overwritten).
+            learn (float): Learning rate.
+        """
+
+        pass
+
+    def state(self):
+        """Get the state vectors (empty for stateless optimizers).
+
+        Returns:
+            list: State arrays, updated in place on every step.
+        """
+
+        return list()
+
+    def restore(self, steps, arrays):
+        """Restore the state saved from `steps` and `state`.
+
+        Args:
+            steps (int): Updates applied so far.
+            arrays (list): State arrays.
+
+        Raises:
+            ValueError: If `arrays` do not match the state vectors.
+        """
+
+        state = self.state()
+        # Check that state vectors match
+        if len(arrays) != len(state) or any(len(a) != len(s) for a, s in zip(arrays, state)):
+            raise ValueError('Optimizer state mismatch ({}).'.format(self.name))
+        for s, a in zip(state, arrays):
+            s[:] = a
+        self.steps = steps
+
+
+class SGD(Optimizer):
+    """Plain gradient descent with a fixed learning rate.
+    """
+
+    name = 'sgd'
+
+    def step(self, params, grad, learn):
+        grad *= learn
+        params += grad
+        self.steps += 1
+
+
+class Momentum(Optimizer):
+    """Classical momentum: updates keep a decaying share of the previous ones.
+
+    Attributes:
+        momentum (float): Share of the previous update kept.
+    """
+
+    name = 'momentum'
+    momentum = None
+
+    _v = None
+
+    def __init__(self, size, momentum=0.9):
+        """Constructor.
+
+        Args:
+            size (int): Number of parameters to update.
+            momentum (float, optional): Defaults to 0.9. Share of the previous update kept.
+
+        Raises:
+            ValueError: If `momentum` is invalid.
+        """
+
+        if not 0 <= momentum < 1:
+            raise ValueError('Momentum must be within the interval [0, 1).')
+        super().__init__(size)
+        self.momentum = momentum
+        # Steady updates grow up to learn / (1 - momentum) times the corrections
+        self.max_learn = round(1 - momentum, 12)
+        self._v = np.zeros(size)
+
+    def step(self, params, grad, learn):
+        self._v *= self.momentum
+        grad *= learn
+        self._v += grad
+        params += self._v
+        self.steps += 1
+
+    def state(self):
+        return [self._v]
+
+
+class Nesterov(Momentum):
+    """Nesterov momentum: classical momentum with a look-ahead correction.
+    """
+
+    name = 'nesterov'
+
+    def step(self, params, grad, learn):
+        grad *= learn
+        self._v *= self.momentum
+        self._v += grad
+        # Same as evaluating corrections at the look-ahead weights
+        params += grad
+        params += self.momentum * self._v
+        self.steps += 1
+
+
+class RMSprop(Optimizer):
+    """RMSprop: corrections are scaled by a running root mean square of their own.
+
+    Attributes:
+        rho (float): Decay of the running mean square.
+        eps (float): Term added to the root mean square to avoid dividing by zero.
+    """
+
+    name = 'rmsprop'
+    rho = None
+    eps = None
+
+    _s = None
+    _tmp = None
+
+    def __init__(self, size, rho=0.9, eps=1e-8):
+        """Constructor.
+
+        Args:
+            size (int): Number of parameters to update.
+            rho (float, optional): Defaults to 0.9. Decay of the running mean square.
+            eps (float, optional): Defaults to 1e-8. Term added to the root
+                mean square to avoid dividing by zero.
+
+        Raises:
+            ValueError: If `rho` or `eps` are invalid.
+        """
+
+        if not 0 <= rho < 1:
+            raise ValueError('Decay rate must be within the interval [0, 1).')
+        if eps <= 0:
+            raise ValueError('Epsilon must be positive.')
+        super().__init__(size)
+        self.rho = rho
+        self.eps = eps
+        self._s = np.zeros(size)
+        self._tmp = np.empty(size)
+
+    def step(self, params, grad, learn):
+        # Update running mean square
+        self._s *= self.rho
+        np.multiply(grad, grad, out=self._tmp)
+        self._tmp *= 1 - self.rho
+        self._s += self._tmp
+        # Scale corrections by its root
+        np.sqrt(self._s, out=self._tmp)
+        self._tmp += self.eps
+        grad /= self._tmp
+        grad *= learn
+        params += grad
+        self.steps += 1
+
+    def state(self):
+        return [self._s]
+
+
+class Adam(Optimizer):
+    """Adam: momentum on the corrections, scaled by their running root mean square.
+
+    Both running means are corrected for their zero initialization.
+
+    Attributes:
+        beta1 (float): Decay of the running mean.
+        beta2 (float): Decay of the running mean square.
+        eps (float): Term added to the root mean square to avoid dividing by zero.
+    """
+
+    name = 'adam'
+    beta1 = None
+    beta2 = None
+    eps = None
+
+    _m = None
+    _v = None
+    _tmp = None
+
+    def __init__(self, size, beta1=0.9, beta2=0.999, eps=1e-8):
+        """Constructor.
+
+        Args:
+            size (int): Number of parameters to update.
+            beta1 (float, optional): Defaults to 0.9. Decay of the running mean.
+            beta2 (float, optional): Defaults to 0.999. Decay of the running mean square.
+            eps (float, optional): Defaults to 1e-8. Term added to the root
+                mean square to avoid dividing by zero.
+
+        Raises:
+            ValueError: If `beta1`, `beta2` or `eps` are invalid.
+        """
+
+        if not (0 <= beta1 < 1 and 0 <= beta2 < 1):
+            raise ValueError('Decay rates must be within the interval [0, 1).')
+        if eps <= 0:
+            raise ValueError('Epsilon must be positive.')
+        super().__init__(size)
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.eps = eps
+        self._m = np.zeros(size)
+        self._v = np.zeros(size)
+        self._tmp = np.empty(size)
+
+    def step(self, params, grad, learn):
+        self.steps += 1
+        # Update running mean and mean square
+        self._m *= self.beta1
+        np.multiply(grad, 1 - self.beta1, out=self._tmp)
+        self._m += self._tmp
+        self._v *= self.beta2
+        np.multiply(grad, grad, out=self._tmp)
+        self._tmp *= 1 - self.beta2
+        self._v += self._tmp
+        # Correct bias of both means (folded into the step size and epsilon)
+        c2 = np.sqrt(1 - self.beta2 ** self.steps)
+        rate = learn * c2 / (1 - self.beta1 ** self.steps)
+        np.sqrt(self._v, out=self._tmp)
+        self._tmp += self.eps * c2
+        np.divide(self._m, self._tmp, out=grad)
+        grad *= rate
+        params += grad
+
+    def state(self):
+        return [self._m, self._v]
+
+
+class LineSearch(Optimizer):
+    """Base class for full-batch optimizers with a line search.
+
+    Every iteration moves the weights along a search direction as far as a
+    line search finds worthwhile (strong Wolfe conditions). Each trial point
+    costs one evaluation of the loss and its gradient over the whole data,
+    and the learning rate is only used as the first trial step along the
+    steepest descent direction.
+
+    Attributes:
+        c1 (float): Sufficient decrease constant of the Wolfe conditions.
+        c2 (float): Curvature constant of the Wolfe conditions.
+        max_evals (int): Maximum evaluations per line search.
+        gtol (float): Largest gradient value taken for zero (converged).
+    """
+
+    full_batch = True
+    c1 = 1e-4
+    c2 = 0.9
+    max_evals = 20
+    gtol = 1e-10
+
+    _f = None
+    _g = None
+    _x = None
+    _steepest = None
+
+    def __init__(self, size):
+        super().__init__(size)
+        self._x = np.empty(size)
+
+    def step(self, params, grad, learn):
+        raise ValueError('{} needs the loss over the whole data (see `iterate`).'.format(self.name))
+
+    def reset(self):
+        """Forget search history, so the next direction is the steepest descent one.
+        """
+
+        self._steepest = True
+
+    @abstractmethod
+    def _direction(self, g, learn):
+        """Get the next search direction.
+
+        Args:
+            g (numpy.ndarray): Gradient at the current weights.
+            learn (float): Learning rate.
+
+        Returns:
+            tuple: (direction, first trial step)
+        """
+
+        pass
+
+    def _update(self, s, y, alpha):
+        """Record an accepted step.
+
+        Args:
+            s (numpy.ndarray): Weight change.
+            y (numpy.ndarray): Gradient change.
+            alpha (float): Step length along the search direction.
+        """
+
+        self._steepest = False
+
+    def iterate(self, fun, params, learn):
+        """Run an iteration.
+
+        Args:
+            fun (callable): Returns the (loss, gradient) pair for the current
+                `params` (the gradient buffer may be reused between calls).
+            params (numpy.ndarray): Weights to update in place.
+            learn (float): Learning rate.
+
+        Returns:
+            tuple: (whether weights were updated, loss before the iteration)
+        """
+
+        # Evaluate starting weights (later iterations reuse the line search result)
+        if self._g is None:
+            f, g = fun()
+            self._f, self._g = f, g.copy()
+        f0, g0 = self._f, self._g
+        # Stop at stationary points
+        if not np.max(np.abs(g0), initial=0) > self.gtol:
+            return False, f0
+        # Fall back to steepest descent if the direction fails
+        found = None
+        while found is None:
+            d, alpha = self._direction(g0, learn)
+            if np.dot(g0, d) < 0:
+                found = self._search(fun, params, d, alpha)
+            if found is None and self._steepest:
+                return False, f0
+            if found is None:
+                self.reset()
+        alpha, f, g = found
+        # Record step and gradient change
+        self._update(alpha * d, g - g0, alpha)
+        self._f, self._g = f, g
+        self.steps += 1
+        return True, f0
+
+    def _search(self, fun, params, d, alpha):
+        """Find a step length satisfying the strong Wolfe conditions.
+
+        Bracketing and zoom phases as in Nocedal & Wright (Algorithms 3.5 and
+        3.6), with safeguarded cubic interpolation.
+
+        Args:
+            fun (callable): Returns the (loss, gradient) pair for the current `params`.
+            params (numpy.ndarray): Weights (left at the accepted point, or
+                restored if none is found).
+            d (numpy.ndarray): Search direction (must point downhill).
+            alpha (float): First trial step.
+
+        Returns:
+            tuple: (step, loss, gradient) at the accepted point (None if not found).
+        """
+
+        x0 = self._x
+        x0[:] = params
+        f0 = self._f
+        d0 = float(np.dot(self._g, d))
+        evals = 0
+
+        def trial(a):
+            np.multiply(d, a, out=params)
+            np.add(params, x0, out=params)
+            f, g = fun()
+            return f, g, float(np.dot(g, d))
+
+        # Bracket an interval with acceptable steps
+        prev = (0.0, f0, d0)
+        lo = hi = None
+        while evals < self.max_evals:
+            f, g, dg = trial(alpha)
+            evals += 1
+            if f > f0 + self.c1 * alpha * d0 or (evals > 1 and f >= prev[1]):
+                lo, hi = prev, (alpha, f, dg)
+                break
+            if abs(dg) <= -self.c2 * d0:
+                return alpha, f, g.copy()
+            if dg >= 0:
+                lo, hi = (alpha, f, dg), prev
+                break
+            prev = (alpha, f, dg)
+            alpha *= 2
+        # Zoom into the interval
+        while lo is not None and evals < self.max_evals:
+            alpha = _cubic(lo, hi)
+            f, g, dg = trial(alpha)
+            evals += 1
+            if f > f0 + self.c1 * alpha * d0 or f >= lo[1]:
+                hi = (alpha, f, dg)
+            else:
+                if abs(dg) <= -self.c2 * d0:
+                    return alpha, f, g.copy()
+                if dg * (hi[0] - lo[0]) >= 0:
+                    hi = lo
+                lo = (alpha, f, dg)
+        # Settle for the lowest point with sufficient decrease, if any
+        if lo is not None and lo[0] > 0:
+            f, g, _ = trial(lo[0])
+            return lo[0], f, g.copy()
+        params[:] = x0
+        return None
+
+
+class LBFGS(LineSearch):
+    """Limited-memory BFGS: quasi-Newton directions from the last weight and gradient changes.
+
+    Attributes:
+        history (int): Number of (weight change, gradient change) pairs kept.
+    """
+
+    name = 'lbfgs'
+    history = None
+
+    _s = None
+    _y = None
+    _rho = None
+    _count = None
+    _head = None
+
+    def __init__(self, size, history=10):
+        """Constructor.
+
+        Args:
+            size (int): Number of parameters to update.
+            history (int, optional): Defaults to 10. Number of (weight change,
+                gradient change) pairs kept.
+
+        Raises:
+            ValueError: If `history` is invalid.
+        """
+
+        if history < 1:
+            raise ValueError('History size must be a positive integer.')
+        super().__init__(size)
+        self.history = history
+        self._s = np.empty((history, size))
+        self._y = np.empty((history, size))
+        self._rho = np.empty(history)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self._count = 0
+        self._head = 0
+
+    def _direction(self, g, learn):
+        # Steepest descent until curvature is known
+        if self._count == 0:
+            self._steepest = True
+            return -g, learn
+        # Two-loop recursion, newest pair first
+        order = [(self._head - i - 1) % self.history for i in range(self._count)]
+        q = g.copy()
+        a = np.empty(self.history)
+        for i in order:
+            a[i] = self._rho[i] * np.dot(self._s[i], q)
+            q -= a[i] * self._y[i]
+        # Scale by the curvature of the newest pair
+        i = order[0]
+        q *= np.dot(self._s[i], self._y[i]) / np.dot(self._y[i], self._y[i])
+        for i in reversed(order):
+            b = self._rho[i] * np.dot(self._y[i], q)
+            q += (a[i] - b) * self._s[i]
+        self._steepest = False
+        return -q, 1.0
+
+    def _update(self, s, y, alpha):
+        super()._update(s, y, alpha)
+        sy = np.dot(s, y)
+        # Skip pairs without positive curvature
+        if not sy > 1e-10 * np.dot(y, y):
+            return
+        self._s[self._head] = s
+        self._y[self._head] = y
+        self._rho[self._head] = 1 / sy
+        self._head = (self._head + 1) % self.history
+        self._count = min(self._count + 1, self.history)
+
+
+class ConjugateGradient(LineSearch):
+    """Nonlinear conjugate gradient (Polak-Ribière+, restarted on non-descent directions).
+    """
+
+    name = 'cg'
+    c2 = 0.1
+
+    _d = None
+    _gd = None
+    _y = None
+    _gg = None
+    _alpha = None
+
+    def reset(self):
+        super().reset()
+        self._d = None
+
+    def _direction(self, g, learn):
+        # Steepest descent on the first iteration
+        if self._d is None:
+            self._steepest = True
+            d, alpha = -g, learn
+        else:
+            β = max(0.0, np.dot(g, self._y) / self._gg)
+            d = β * self._d
+            d -= g
+            # Step from the previous decrease along the previous direction
+            alpha = self._alpha * self._gd / np.dot(g, d) if β else self._alpha
+            self._steepest = not β
+        self._d = d
+        self._gd = np.dot(g, d)
+        self._gg = np.dot(g, g)
+        return d, alpha
+
+    def _update(self, s, y, alpha):
+        super()._update(s, y, alpha)
+        self._y = y
+        self._alpha = alpha
+
+
+def _cubic(lo, hi):
+    """Minimize the cubic interpolating two line search points.
+
+    Args:
+        lo (tuple): (step, loss, slope) at one end of the interval.
+        hi (tuple): (step, loss, slope) at the other end.
+
+    Returns:
+        float: Step inside the interval (its midpoint if the minimum is too close to the ends).
+    """
+
+    (a0, f0, d0), (a1, f1, d1) = lo, hi
+    a, b = min(a0, a1), max(a0, a1)
+    w = b - a
+    e = d0 + d1 - 3 * (f0 - f1) / (a0 - a1)
+    r = e * e - d0 * d1
+    if r >= 0:
+        r = np.copysign(np.sqrt(r), a1 - a0)
+        x = a1 - (a1 - a0) * (d1 + r - e) / (d1 - d0 + 2 * r)
+        if np.isfinite(x) and a + 0.1 * w <= x <= b - 0.1 * w:
+            return float(x)
+    return (a0 + a1) / 2
+
+
+def register(cls):
+    """Register an optimizer class under its name.
+
+    Args:
+        cls (type): Optimizer class to register.
+
+    Raises:
+        ValueError: If its name is already registered.
+
+    Returns:
+        type: Registered class.
+    """
+
+    if cls.name in OPTIMIZERS:
+        raise ValueError('Optimizer "{}" is already registered.'.format(cls.name))
+    OPTIMIZERS[cls.name] = cls
+    return cls
+
+
+def create(name, size, **settings):
+    """Create a registered optimizer.
+
+    Args:
+        name (str): Registered name.
+        size (int): Number of parameters to update.
+        **settings: Optimizer settings (e.g. `momentum`).
+
+    Raises:
+        ValueError: If `name` is not registered or `settings` are invalid.
+
+    Returns:
+        Optimizer: New optimizer, with empty state.
+    """
+
+    if name not in OPTIMIZERS:
+        raise ValueError('Unknown optimizer "{}" (expected one of: {}).'.format(
+            name, ', '.join(OPTIMIZERS)))
+    return OPTIMIZERS[name](size, **settings)
+
+
+# Register built-in optimizers
+for _cls in (SGD, Momentum, Nesterov, RMSprop, Adam, LBFGS, ConjugateGradient):
+    register(_cls)
@@ -0,0 +1,124 @@
+# !/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Running statistics for input normalization.
+"""
+
+import numpy as np
+
+
+class RunningStats:
+    """Running mean and variance of every input, updated chunk by chunk.
+
+    Each chunk is reduced to its own mean and sum of squared deviations, which
+    are then merged into the running ones (Welford's method, generalized to
+    chunks by Chan et al.), so the whole data is never needed at once and
+    statistics computed over separate shards can be merged afterwards.
+
+    Attributes:
+        count (int): Number of instances seen.
+        mean (numpy.ndarray): Mean value of every input.
+        m2 (numpy.ndarray): Sum of squared deviations from the mean of every input.
+    """
+
+    count = None
+    mean = None
+    m2 = None
+
+    def __init__(self, size, count=0, mean=None, m2=None):
+        """Constructor.
+
+        Args:
+            size (int): Number of inputs.
+            count (int, optional): Defaults to 0. Number of instances seen.
+            mean (numpy.ndarray, optional): Defaults to None. Mean values (zeros if None).
+            m2 (numpy.ndarray, optional): Defaults to None. Sums of squared deviations (zeros if None).
+        """
+
+        self.count = count
+        self.mean = np.zeros(size) if mean is None else np.array(mean, dtype=float)
+        self.m2 = np.zeros(size) if m2 is None else np.array(m2, dtype=float)
+
+    def _merge(self, count, mean, m2):
+        """Merge statistics of other instances into these.
+
+        Args:
+            count (int): Number of other instances.
+            mean (numpy.ndarray): Mean values of other instances.
+            m2 (numpy.ndarray): Sums of squared deviations of other instances.
+        """
+
+        if count == 0:
+            return
+        total = self.count + count
+        δ = mean - self.mean
+        self.mean = self.mean + δ * (count / total)
+        self.m2 = self.m2 + m2 + δ ** 2 * (self.count * count / total)
+        self.count = total
+
+    def update(self, data):
+        """Update statistics with a chunk of instances.
+
+        Args:
+            data (list): Ordered list (or matrix) of input instances.
+
+        Raises:
+            ValueError: If `data` is invalid.
+
+        Returns:
+            RunningStats: These statistics.
+        """
+
+        a = np.asarray(data, dtype=float)
+        # Empty data still has the input width
+        if a.size == 0:
+            a = a.reshape(0, len(self.mean))
+        # Check that input sizes match
+        if a.ndim != 2 or a.shape[1] != len(self.mean):
+            raise ValueError(
+                'Input instance size mismatch ({}).'.format(len(self.mean)))
+        if len(a):
+            mean = a.mean(axis=0)
+            self._merge(len(a), mean, ((a - mean) ** 2).sum(axis=0))
+        return self
+
+    def merge(self, other):
+        """Merge statistics computed over other instances (e.g. another shard).
+
+        Args:
+            other (RunningStats): Statistics to merge.
+
+        Raises:
+            ValueError: If `other` is for a different number of inputs.
+
+        Returns:
+            RunningStats: These statistics.
+        """
+
+        if len(other.mean) != len(self.mean):
+            raise ValueError(
+                'Input instance size mismatch ({}).'.format(len(self.mean)))
+        self._merge(other.count, other.mean, other.m2)
+        return self
+
+    def std(self):
+        """Get the (sample) standard deviation of every input.
+
+        Raises:
+            ValueError: If less than two instances were seen.
+
+        Returns:
+            numpy.ndarray: Standard deviations.
+        """
+
+        if self.count < 2:
+            raise ValueError('At least two instances are needed to normalize data.')
+        return np.sqrt(self.m2 / (self.count - 1))
+
+    def copy(self):
+        """Get a copy of these statistics.
+
+        Returns:
+            RunningStats: Copy.
+        """
+
+        return RunningStats(len(self.mean), self.count, self.mean, self.m2)
@@ -0,0 +1,112 @@
+# !/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Early stopping for training loops.
+"""
+
+from math import isnan
+from time import perf_counter
+
+import numpy as np
+
+
+class EarlyStopping:
+    """Stopping criteria for training, keeping the best weights seen.
+
+    After every epoch, the monitored error (e.g. validation MSE) is compared
+    with the lowest one so far: training stops once it has not improved by
+    more than `tol` for `patience` evaluated epochs, or once `max_time`
+    seconds have passed since the start.
+
+    Attributes:
+        tol (float): Minimum error decrease that counts as an improvement.
+        patience (int): Evaluated epochs without improvement before stopping (None for no limit).
+        max_time (float): Maximum training seconds (None for no limit).
+        best (float): Lowest monitored error so far (None before the first evaluated epoch).
+        best_epoch (int): Epoch of the lowest monitored error.
+        reason (str): Why training should stop (None while it should go on).
+    """
+
+    tol = None
+    patience = None
+    max_time = None
+    best = None
+    best_epoch = None
+    reason = None
+
+    _wait = None
+    _start = None
+    _params = None
+
+    def __init__(self, tol=None, patience=None, max_time=None):
+        """Constructor.
+
+        Args:
+            tol (float, optional): Defaults to None. Minimum error decrease that
+                counts as an improvement (0 if None). If given without
+                `patience`, training stops on the first epoch that falls short.
+            patience (int, optional): Defaults to None. Evaluated epochs without
+                improvement before stopping (None for no limit).
+            max_time (float, optional): Defaults to None. Maximum training seconds (None for no limit).
+
+        Raises:
+            ValueError: If `tol`, `patience` or `max_time` are invalid.
+        """
+
+        # Check settings
+        if tol is not None and tol < 0:
+            raise ValueError('Tolerance cannot be negative.')
+        if patience is not None and patience < 1:
+            raise ValueError('Patience must be a positive integer.')
+        if max_time is not None and max_time <= 0:
+            raise ValueError('Maximum time must be positive.')
+        self.tol = tol or 0.0
+        self.patience = patience if patience is not None or tol is None else 1
+        self.max_time = max_time
+        self._wait = 0
+        self._start = perf_counter()
+
+    def update(self, epoch, error, params):
+        """Check the stopping criteria after an epoch.
+
+        Args:
+            epoch (int): Epochs trained so far.
+            error (float): Monitored error after the epoch (NaN if not evaluated).
+            params (numpy.ndarray): Current weights (copied if they are the best so far).
+
+        Returns:
+            bool: Whether training should stop.
+        """
+
+        # Epochs that were not evaluated only count for time
+        if not isnan(error):
+            if self.best is None or error < self.best - self.tol:
+                self._wait = 0
+            else:
+                self._wait += 1
+            # Keep the best weights (even if the improvement is within tolerance)
+            if self.best is None or error < self.best:
+                self.best = error
+                self.best_epoch = epoch
+                if self._params is None:
+                    self._params = np.empty_like(params)
+                self._params[:] = params
+            if self.patience is not None and self._wait >= self.patience:
+                self.reason = 'no improvement in {} epochs'.format(self._wait)
+        if self.max_time is not None and perf_counter() - self._start >= self.max_time:
+            self.reason = 'time limit reached'
+        return self.reason is not None
+
+    def restore(self, params):
+        """Restore the best weights seen.
+
+        Args:
+            params (numpy.ndarray): Weights to overwrite.
+
+        Returns:
+            bool: Whether weights were restored (False if no epoch was evaluated).
+        """
+
+        if self._params is None:
+            return False
+        params[:] = self._params
+        return True
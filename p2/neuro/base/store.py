@@ -0,0 +1,89 @@
+# !/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Binary model files.
+
+A model file starts with `MAGIC`, followed by the length of a JSON header as
+an 8 byte little-endian integer and the header itself. The header holds the
+model settings and the shapes of the arrays, whose float64 values follow it
+back to back (starting at an `ALIGN` boundary) so that they can be memory
+mapped as is.
+"""
+
+import json
+import os
+
+import numpy as np
+
+# File signature
+MAGIC = b'NEURONET'
+# Alignment for array data
+ALIGN = 64
+# Array data type (little-endian float64)
+DTYPE = np.dtype('<f8')
+
+
+def write(filename, header, arrays):
+    """Write a model file.
+
+    Args:
+        filename (str): Output file.
+        header (dict): Model settings (must be JSON serializable).
+        arrays (list): Arrays to store, in order.
+    """
+
+    arrays = [np.asarray(a, dtype=DTYPE) for a in arrays]
+    header = dict(header, shapes=[list(a.shape) for a in arrays])
+    data = json.dumps(header).encode('utf-8')
+    # Pad header so that array data starts at an aligned offset
+    size = len(MAGIC) + 8 + len(data)
+    data += b' ' * (-size % ALIGN)
+    # Write to a new file and move it into place, so that nets mapping
+    # the previous contents are not affected
+    tmp = '{}.tmp'.format(filename)
+    with open(tmp, 'wb') as file:
+        file.write(MAGIC)
+        file.write(len(data).to_bytes(8, 'little'))
+        file.write(data)
+        for a in arrays:
+            file.write(np.ascontiguousarray(a).tobytes())
+    os.replace(tmp, filename)
+
+
+def read(filename):
+    """Read a model file, mapping its arrays to memory.
+
+    Arrays are mapped copy-on-write: they can be modified (e.g. by further
+    training) without changing the file.
+
+    Args:
+        filename (str): Input file.
+
+    Raises:
+        ValueError: If `filename` is not a valid model file.
+
+    Returns:
+        tuple: (header, arrays)
+    """
+
+    with open(filename, 'rb') as file:
+        # Check file signature
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError('"{}" is not a model file.'.format(filename))
+        size = int.from_bytes(file.read(8), 'little')
+        header = json.loads(file.read(size).decode('utf-8'))
+    offset = len(MAGIC) + 8 + size
+    shapes = header.pop('shapes')
+    count = sum(int(np.prod(s)) for s in shapes)
+    # Map every array at once (a zero-length map is not allowed)
+    if count:
+        data = np.memmap(filename, dtype=DTYPE, mode='c',
+                         offset=offset, shape=(count,))
+    else:
+        data = np.zeros(0, dtype=DTYPE)
+    # Split mapped data into arrays
+    arrays = list()
+    for s in shapes:
+        n = int(np.prod(s))
+        arrays.append(data[:n].reshape(s))
+        data = data[n:]
+    return header, arrays
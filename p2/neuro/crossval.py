@@ -0,0 +1,90 @@
+# !/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""K-fold cross-validation.
+"""
+
+from contextlib import redirect_stdout
+from io import StringIO
+from multiprocessing import Pool
+from random import seed
+from statistics import mean, pstdev
+
+# Dataset shared by the worker processes (set by the pool initializer)
+_data = dict()
+
+
+def _load(cls, config, ds, folds):
+    """Pool initializer: keep the dataset and folds for the worker process.
+
+    Args:
+        cls (type): Net class to train.
+        config (dict): Net configuration ('sizes', 'init', 'learn', 'epochs',
+            'normalize' and optionally 'batch_size' and 'optimizer').
+        ds (Dataset): Dataset (read only).
+        folds (list): Lists of instance indices, one per fold.
+    """
+
+    _data['cls'] = cls
+    _data['config'] = config
+    _data['ds'] = ds
+    _data['folds'] = folds
+    # Forked workers must not share random state
+    seed()
+
+
+def _fold(i):
+    """Train on every fold but one and gather statistics on it.
+
+    Args:
+        i (int): Index of the test fold.
+
+    Returns:
+        tuple: Statistics as returned by the `stats` method of the net.
+    """
+
+    cls, config, ds, folds = _data['cls'], _data['config'], _data['ds'], _data['folds']
+    # Test on current fold, train on the others
+    test = ds.take(folds[i])
+    train = ds.take([j for k, f in enumerate(folds) if k != i for j in f])
+    p = cls(cls.__name__, ds.sizein, ds.sizeout, config['sizes'])
+    p.randomize_synapses(-config['init'], config['init'])
+    # Silence training progress
+    with redirect_stdout(StringIO()):
+        p.train(train[0], train[1], config['learn'], config['epochs'],
+                normalize=config['normalize'], batch_size=config.get('batch_size', 1),
+                optimizer=config.get('optimizer', 'sgd'))
+    return p.stats(test[0], test[1])
+
+
+def cross_validate(cls, config, ds, folds, jobs=None):
+    """Run k-fold cross-validation, training the k nets in parallel.
+
+    The dataset is handed once to each worker process and only read there.
+
+    Args:
+        cls (type): Net class to train.
+        config (dict): Net configuration ('sizes', 'init', 'learn', 'epochs',
+            'normalize' and optionally 'batch_size' and 'optimizer').
+        ds (Dataset): Dataset.
+        folds (list): Lists of instance indices, one per fold (see `Dataset.folds`).
+        jobs (int, optional): Defaults to None. Worker processes (None for one per CPU).
+
+    Returns:
+        list: Statistics for every fold, as returned by the `stats` method of the net.
+    """
+
+    with Pool(jobs, initializer=_load, initargs=(cls, config, ds, folds)) as pool:
+        return pool.map(_fold, range(len(folds)))
+
+
+def summary(values):
+    """Summarize a statistic over the folds.
+
+    Args:
+        values (list): Statistic value for every fold.
+
+    Returns:
+        tuple: (mean, standard deviation)
+    """
+
+    return mean(values), pstdev(values)
@@ -3,9 +3,14 @@
 """Dataset management.
 """
 
+from itertools import islice
 from math import floor
 from random import shuffle
 
+import numpy as np
+
+from neuro.cache import read
+
 
 class Dataset:
     """Dataset class.
@@ -23,31 +28,28 @@ class Dataset:
     _datain = None
     _dataout = None
 
-    def __init__(self, filename):
+    def __init__(self, filename, cache=None):
         """Constructor.
 
         Args:
             filename (str): Dataset file.
+            cache (str, optional): Defaults to None. Cache directory for parsed
+                data (None for the default one, '' to disable caching).
         """
 
-        # Open dataset file
-        with open(filename, 'r') as file:
-            # Load data size
-            [_sizein, _sizeout] = file.readline().split()
-            self.sizein = int(_sizein)
-            self.sizeout = int(_sizeout)
-            # Load instances
-            data = [[float(x) for x in l.split()]
-                    for l in file.read().splitlines()]
-            # Save instance count
-            self.count = len(data)
-            # Split data
-            self._datain = [d[:self.sizein] for d in data]
-            self._dataout = [d[self.sizein:] for d in data]
+        # Load data size and instances (through the binary cache)
+        self.sizein, self.sizeout, data = read(filename, cache=cache)
+        # Save instance count
+        self.count = len(data)
+        # Split data into contiguous matrices
+        self._datain = np.ascontiguousarray(data[:, :self.sizein])
+        self._dataout = np.ascontiguousarray(data[:, self.sizein:])
 
     def data(self):
         """Return a tuple with input and output data.
 
+        Data is not copied, so every call returns the same matrices.
+
         Returns:
             tuple: (input data, output data)
         """
@@ -76,13 +78,113 @@ class Dataset:
         indices = list(range(self.count))
         # Shuffle list of indices
         shuffle(indices)
-        # Create train partition
-        train = list()
-        train.append(list(map(self._datain.__getitem__, indices[:split])))
-        train.append(list(map(self._dataout.__getitem__, indices[:split])))
-        # Create test partition
-        test = list()
-        test.append(list(map(self._datain.__getitem__, indices[split:])))
-        test.append(list(map(self._dataout.__getitem__, indices[split:])))
+        # Create partitions
+        train = self.take(indices[:split])
+        test = self.take(indices[split:])
         # Return partitions
         return train, test
+
+    def take(self, indices):
+        """Return a tuple with input and output data for given instances.
+
+        Args:
+            indices (list): Ordered list of instance indices.
+
+        Returns:
+            tuple: (input data, output data)
+        """
+
+        return self._datain[indices], self._dataout[indices]
+
+    def folds(self, k, stratified=False, shuff=True):
+        """Split instances into folds for cross-validation.
+
+        Args:
+            k (int): Number of folds.
+            stratified (bool, optional): Defaults to False. Keep class ratios in every fold.
+            shuff (bool, optional): Defaults to True. Shuffle data.
+
+        Raises:
+            ValueError: If `k` is invalid.
+
+        Returns:
+            list: Lists of instance indices, one per fold.
+        """
+
+        # Check that every fold gets instances
+        if not 1 < k <= self.count:
+            raise ValueError("Invalid number of folds.")
+        # Create list of indices
+        indices = list(range(self.count))
+        # Shuffle list of indices
+        if shuff:
+            shuffle(indices)
+        # Group instances by class (stable, so shuffle is kept within classes)
+        if stratified:
+            indices.sort(key=np.argmax(self._dataout, axis=1).__getitem__)
+        # Deal instances to folds
+        return [indices[i::k] for i in range(k)]
+
+
+class DatasetStream:
+    """Dataset read from its file in chunks, every time it is iterated.
+
+    Only a chunk of instances is held in memory at a time, so files larger
+    than the available memory can be used for training (see `MLPerceptron.train`).
+
+    Attributes:
+        sizein (int): Input layer size.
+        sizeout (int): Output layer size.
+        chunk_size (int): Number of instances per chunk.
+    """
+
+    sizein = None
+    sizeout = None
+    chunk_size = None
+
+    _filename = None
+
+    def __init__(self, filename, chunk_size=4096):
+        """Constructor.
+
+        Args:
+            filename (str): Dataset file.
+            chunk_size (int, optional): Defaults to 4096. Number of instances per chunk.
+
+        Raises:
+            ValueError: If `chunk_size` is invalid.
+        """
+
+        # Check chunk size
+        if chunk_size < 1:
+            raise ValueError('Chunk size must be a positive integer.')
+        self.chunk_size = chunk_size
+        self._filename = filename
+        # Load data size
+        with open(filename, 'rb') as file:
+            [_sizein, _sizeout] = file.readline().split()
+        self.sizein = int(_sizein)
+        self.sizeout = int(_sizeout)
+
+    def __iter__(self):
+        """Read the dataset file chunk by chunk.
+
+        Raises:
+            ValueError: If an instance does not match the data size.
+
+        Yields:
+            tuple: (input data, output data) matrices for a chunk of instances.
+        """
+
+        with open(self._filename, 'rb') as file:
+            # Skip data size
+            file.readline()
+            while True:
+                # Read next lines (skipping empty ones)
+                lines = [l for l in islice(file, self.chunk_size) if not l.isspace()]
+                if not lines:
+                    return
+                # Parse chunk at once
+                data = np.array(b' '.join(lines).split(), dtype=float).reshape(
+                    -1, self.sizein + self.sizeout)
+                yield data[:, :self.sizein], data[:, self.sizein:]
@@ -3,8 +3,11 @@
 """Multilayer Perceptron implementation.
 """
 
-from math import exp
-from copy import deepcopy
+from contextlib import nullcontext
+from os.path import exists
+from random import getstate, setstate
+
+import numpy as np
 try:
     from doc_inherit import method_doc_inherit
 except ImportError:
@@ -13,6 +16,13 @@ except ImportError:
         return func
 
 from neuro.base.net import Net, BIAS_KEY
+from neuro.base import store
+from neuro.base.activation import get as get_activation
+from neuro.base.compiled import CompiledSynapses
+from neuro.base.optimizer import create as create_optimizer
+from neuro.base.stats import RunningStats
+from neuro.base.stopping import EarlyStopping
+from neuro.parallel import TrainingPool
 
 # Input cells basename
 NAME_I = 'x'
@@ -20,6 +30,8 @@ NAME_I = 'x'
 NAME_O = 'y'
 # Hidden cells basename
 NAME_H = 'z'
+# Normalized input matrices kept by every net
+CACHED_INPUTS = 2
 
 
 class MLPerceptron(Net):
@@ -30,18 +42,27 @@ class MLPerceptron(Net):
         sizein (int): Input layer size.
         sizeout (int): Output layer size.
         hsizes (list): Hidden layers sizes.
+        activation (str): Activation function name (see `neuro.base.activation`).
     """
 
     name = None
     sizein = None
     sizeout = None
     hsizes = None
+    activation = None
+    _activation = None
     _hnames = None
+    _names = None
+    _sizes = None
+    _inputs = None
 
-    def __init__(self, name, sizein, sizeout, hsizes):
+    def __init__(self, name, sizein, sizeout, hsizes, activation='bipolar'):
         if not hsizes:
             raise ValueError('Invalid hidden layers sizes.')
         super().__init__(name)
+        self._inputs = list()
+        self.activation = activation
+        self._activation = get_activation(activation)
         self.sizein = sizein
         self.sizeout = sizeout
         self.hsizes = hsizes
@@ -64,108 +85,827 @@ class MLPerceptron(Net):
         self.add_synapses(NAME_I, self._hnames[0], 0, n=sizein, m=hsizes[0])
         # Add output synapses
         self.add_synapses(self._hnames[i], NAME_O, 0, n=hsizes[i], m=sizeout)
+        # Compile synapses into per-layer weight matrices
+        self._names = [NAME_I] + self._hnames + [NAME_O]
+        self._sizes = [sizein] + hsizes + [sizeout]
+        self._synapses = CompiledSynapses.from_dict(
+            self._synapses, self._names, self._sizes)
+
+    @property
+    def params(self):
+        """numpy.ndarray: Flat vector with every weight and bias of the net (see `CompiledSynapses`).
+        """
+
+        return self._synapses.params
+
+    def __getstate__(self):
+        # Cached input matrices are not worth sending to other processes
+        state = self.__dict__.copy()
+        state['_inputs'] = list()
+        return state
+
+    def _matrix(self, data, size=None, layer='input'):
+        """Get the matrix for given instances, checking their size.
+
+        Args:
+            data (list): Ordered list (or matrix) of instances.
+            size (int, optional): Defaults to None. Instance size (None for input layer size).
+            layer (str, optional): Defaults to 'input'. Layer name for error messages.
+
+        Raises:
+            ValueError: If `data` is invalid.
+
+        Returns:
+            numpy.ndarray: Instances (one per row).
+        """
+
+        if size is None:
+            size = self.sizein
+        a = np.asarray(data, dtype=float)
+        # Empty data still has the layer width
+        if a.size == 0:
+            a = a.reshape(0, size)
+        # Check that sizes match
+        if a.ndim != 2 or a.shape[1] != size:
+            raise ValueError('{} instances do not match {} layer size ({}).'.format(
+                layer.capitalize(), layer, size))
+        return a
+
+    def _output(self, data):
+        """Get the matrix of expected output instances.
+
+        Args:
+            data (list): Ordered list (or matrix) of output instances.
+
+        Raises:
+            ValueError: If `data` is invalid.
+
+        Returns:
+            numpy.ndarray: Output instances (one per row).
+        """
+
+        return self._matrix(data, self.sizeout, 'output')
+
+    def _input(self, data):
+        """Get the (normalized) input matrix for given data.
+
+        Matrices for the last data arrays are cached, so normalization is only
+        done once for them (the arrays must not be modified in place).
+
+        Args:
+            data (list): Ordered list (or matrix) of input instances.
+
+        Raises:
+            ValueError: If `data` is invalid.
+
+        Returns:
+            numpy.ndarray: Input layer values (one instance per row).
+        """
+
+        # Reuse matrix cached for the same data and normalization
+        key = (data, self._normalize, self._μ, self._σ)
+        for k, a in self._inputs:
+            if all(x is y for x, y in zip(k, key)):
+                return a
+        a = self._matrix(data)
+        # Normalize input if enabled
+        if self._normalize:
+            a = (a - np.asarray(self._μ)) / np.asarray(self._σ)
+        # Cache matrix for data arrays (lists are easily modified in place)
+        if isinstance(data, np.ndarray):
+            self._inputs = [(key, a)] + self._inputs[:CACHED_INPUTS - 1]
+        return a
+
+    def _forward(self, data):
+        """Vectorized forward pass through the compiled layers.
+
+        Args:
+            data (list): Ordered list (or matrix) of input instances.
+
+        Raises:
+            ValueError: If `data` is invalid.
+
+        Returns:
+            tuple: (layer inputs, layer outputs), one matrix per layer from input to output.
+        """
+
+        return self._layers(self._input(data))
+
+    def _layers(self, a):
+        """Vectorized forward pass for input layer values.
+
+        Args:
+            a (numpy.ndarray): Input layer values (already normalized).
+
+        Returns:
+            tuple: (layer inputs, layer outputs), one matrix per layer from input to output.
+        """
+
+        # Input layer values (duplicated for data consistency)
+        ins = [a]
+        outs = [a]
+        # Propagate through every layer
+        for w, b in zip(self._synapses.weights, self._synapses.biases[1:]):
+            s = np.dot(a, w.T) + b
+            a = self._activation.f(s)
+            ins.append(s)
+            outs.append(a)
+        return ins, outs
+
+    def _buffers(self):
+        """Allocate buffers for online backpropagation.
+
+        Returns:
+            tuple: (layer inputs, layer outputs, weight corrections)
+        """
+
+        ins = [np.zeros(n) for n in self._sizes]
+        outs = [np.zeros(n) for n in self._sizes]
+        grad = CompiledSynapses(self._names, self._sizes)
+        return ins, outs, grad
+
+    def _step(self, x, t, learn, ins, outs, grad, opt=None):
+        """Online backpropagation step for a single instance.
+
+        Every delta is computed with the weights previous to the step, and
+        all corrections are applied at once at the end of it.
+
+        Args:
+            x (numpy.ndarray): Input layer values (already normalized).
+            t (numpy.ndarray): Expected output instance.
+            learn (float): Learning rate.
+            ins (list): Buffers for layer inputs.
+            outs (list): Buffers for layer outputs.
+            grad (CompiledSynapses): Buffer for weight corrections.
+            opt (Optimizer, optional): Defaults to None. Update rule (None for
+                plain SGD, applied as corrections are computed).
+
+        Returns:
+            numpy.ndarray: Output error (expected minus obtained values).
+        """
+
+        w = self._synapses.weights
+        b = self._synapses.biases
+        act = self._activation
+        # Forward pass
+        outs[0][:] = x
+        for k in range(1, len(self._sizes)):
+            np.dot(w[k - 1], outs[k - 1], out=ins[k])
+            ins[k] += b[k]
+            act.f(ins[k], out=outs[k])
+        # Initialize input deltas
+        e = t - outs[-1]
+        δ_in = e
+        # Retropropagation
+        for k in range(len(self._sizes) - 1, 0, -1):
+            # Compute current deltas (in the bias corrections buffer)
+            δ = act.df(ins[k], outs[k], out=grad.biases[k])
+            δ *= δ_in
+            # Compute input deltas for previous layer
+            if k > 1:
+                δ_in = np.dot(δ, w[k - 1])
+            # Save bias and synaptic weight corrections
+            if opt is None:
+                δ *= learn
+            np.outer(δ, outs[k - 1], out=grad.weights[k - 1])
+        # Update synapses
+        if opt is None:
+            self._synapses.params += grad.params
+        else:
+            opt.step(self._synapses.params, grad.params, learn)
+        return e
+
+    def _gradient(self, X, T, grad):
+        """Accumulate backpropagation corrections over a batch of instances.
+
+        Args:
+            X (numpy.ndarray): Input layer values (already normalized), one instance per row.
+            T (numpy.ndarray): Expected output instances.
+            grad (CompiledSynapses): Buffer where the summed corrections are written.
+
+        Returns:
+            numpy.ndarray: Output errors (expected minus obtained values).
+        """
+
+        w = self._synapses.weights
+        # Forward pass
+        ins, outs = self._layers(X)
+        # Initialize input deltas
+        e = T - outs[-1]
+        δ_in = e
+        # Retropropagation
+        for k in range(len(self._sizes) - 1, 0, -1):
+            # Compute current deltas (one row per instance)
+            δ = self._activation.df(ins[k], outs[k])
+            δ *= δ_in
+            # Sum bias and synaptic weight corrections over the batch
+            np.sum(δ, axis=0, out=grad.biases[k])
+            np.dot(δ.T, outs[k - 1], out=grad.weights[k - 1])
+            # Compute input deltas for previous layer
+            if k > 1:
+                δ_in = np.dot(δ, w[k - 1])
+        return e
+
+    def _loss(self, X, T, grad, pool=None):
+        """Compute the output MSE and its gradient in a single pass over the data.
+
+        Args:
+            X (numpy.ndarray): Input layer values (already normalized), one instance per row.
+            T (numpy.ndarray): Expected output instances.
+            grad (CompiledSynapses): Buffer where the gradient is written.
+            pool (TrainingPool, optional): Defaults to None. Workers to share the pass with.
+
+        Returns:
+            tuple: (MSE, gradient vector in `grad`)
+        """
+
+        if pool is None:
+            e = self._gradient(X, T, grad)
+            sse = float(np.vdot(e, e))
+        else:
+            _, sse = pool.gradient(0, len(X), grad)
+        # Corrections are summed downhill steps for half the squared errors
+        grad.params *= -2 / T.size
+        return sse / T.size, grad.params
+
+    def loss(self, params, datain, dataout):
+        """Compute the output MSE for given weights, and its gradient.
+
+        Both come from a single vectorized pass over the data. The gradient
+        follows the activation derivative the net is trained with (see
+        `neuro.base.activation`), and the net weights are left untouched.
+
+        Args:
+            params (numpy.ndarray): Flat weights vector (laid out as `params`).
+            datain (list): Ordered list (or matrix) of input instances.
+            dataout (list): Ordered list (or matrix) of expected output instances.
+
+        Raises:
+            ValueError: If `params`, `datain` or `dataout` are invalid.
+
+        Returns:
+            tuple: (MSE, gradient vector)
+        """
+
+        params = np.ascontiguousarray(params, dtype=float)
+        # Check that sizes match
+        if params.shape != self._synapses.params.shape:
+            raise ValueError('Weights vector does not match net size ({}).'.format(
+                len(self._synapses.params)))
+        X = self._input(datain)
+        T = self._output(dataout)
+        if len(X) != len(T):
+            raise ValueError('Input and output instance counts do not match.')
+        # Evaluate on a view of the given weights
+        synapses = self._synapses
+        self._synapses = CompiledSynapses(self._names, self._sizes, params)
+        try:
+            return self._loss(X, T, CompiledSynapses(self._names, self._sizes))
+        finally:
+            self._synapses = synapses
+
+    def test_instance(self, instance, hist=None):
+        """Run the net with an instance as input.
+
+        Args:
+            instance (list): Ordered list of values for input layer.
+            hist (dict, optional): Defaults to None. Value history [in, out] to populate.
+
+        Raises:
+            ValueError: If `instance` is invalid.
+
+        Returns:
+            list: Ordered list of values from output layer.
+        """
+
+        # Check that input sizes match
+        if len(instance) != self.sizein:
+            raise ValueError('Instance {} does not match input layer size ({}).'.format(
+                instance, self.sizein))
+        # Run forward pass
+        ins, outs = self._forward([instance])
+        # Populate history if required
+        if hist is not None:
+            for name, s, z in zip(self._names, ins, outs):
+                for i, (_s, _z) in enumerate(zip(s[0].tolist(), z[0].tolist())):
+                    hist['{}{}'.format(name, i)] = [_s, _z]
+        # Return output layer values
+        return outs[-1][0].tolist()
+
+    def test(self, data):
+        """Run the net for a whole matrix of instances at once.
+
+        Args:
+            data (list): Ordered list (or matrix) of input instances.
+
+        Raises:
+            ValueError: If `data` is invalid.
+
+        Returns:
+            numpy.ndarray: Matrix of output instances (one per row).
+        """
+
+        return self._test(self._input(data))
+
+    def _test(self, a):
+        """Run the net for input layer values.
+
+        Args:
+            a (numpy.ndarray): Input layer values (already normalized).
+
+        Returns:
+            numpy.ndarray: Matrix of output instances (one per row).
+        """
+
+        return self._layers(a)[1][-1]
+
+    def _epoch(self, X, T, learn, batch_size, buffers, pool=None, opt=None):
+        """Run a training epoch over the data.
+
+        Args:
+            X (numpy.ndarray): Input layer values (already normalized).
+            T (numpy.ndarray): Expected output instances.
+            learn (float): Learning rate.
+            batch_size (int): Instances per weight update.
+            buffers (tuple): Buffers from `_buffers`.
+            pool (TrainingPool, optional): Defaults to None. Workers to share the epoch with.
+            opt (Optimizer, optional): Defaults to None. Update rule (None for plain SGD).
+
+        Returns:
+            tuple: (whether any correction was needed, sum of squared output
+                errors of the forward passes made for the updates)
+        """
+
+        ins, outs, grad = buffers
+        # Full-batch iteration (batch size does not apply)
+        if opt is not None and opt.full_batch:
+            updated, f = opt.iterate(lambda: self._loss(X, T, grad, pool),
+                                     self._synapses.params, learn)
+            return updated, f * T.size
+        # Assume no correction is needed
+        updated = False
+        sse = 0.0
+        # Asynchronous online training
+        if batch_size == 1 and pool is not None:
+            updated, sse = pool.online(learn)
+        # Online training
+        elif batch_size == 1:
+            # For each training pair in data
+            for x, t in zip(X, T):
+                # Run backpropagation step
+                e = self._step(x, t, learn, ins, outs, grad, opt)
+                sse += np.dot(e, e)
+                # Check if correction was needed
+                if not updated and e.any():
+                    updated = True
+        # Mini-batch training
+        else:
+            # For each batch of training pairs in data
+            for i in range(0, len(X), batch_size):
+                j = min(i + batch_size, len(X))
+                # Accumulate corrections over the batch
+                if pool is None:
+                    e = self._gradient(X[i:j], T[i:j], grad)
+                    e, _sse = e.any(), np.vdot(e, e)
+                else:
+                    e, _sse = pool.gradient(i, j, grad)
+                sse += _sse
+                # Update synapses with mean correction
+                if opt is None:
+                    self._synapses.params += learn / (j - i) * grad.params
+                else:
+                    grad.params /= j - i
+                    opt.step(self._synapses.params, grad.params, learn)
+                # Check if correction was needed
+                updated = updated or e
+        return updated, float(sse)
+
+    def _normalize_stream(self, chunks):
+        """Enable input normalization for data read in chunks.
+
+        Statistics are updated chunk by chunk in a single pass, so only a
+        chunk is held in memory at a time.
+
+        Args:
+            chunks (iterable): (input data, output data) chunks.
+
+        Raises:
+            ValueError: If `chunks` are invalid.
+        """
+
+        stats = RunningStats(self.sizein)
+        for a, _ in chunks:
+            stats.update(a)
+        self.set_normalization(stats)
+
+    def _stream_epoch(self, chunks, learn, batch_size, buffers, opt=None):
+        """Run a training epoch over data read in chunks.
+
+        Mini-batches do not span chunks (the last one of each chunk may be smaller).
+
+        Args:
+            chunks (iterable): (input data, output data) chunks.
+            learn (float): Learning rate.
+            batch_size (int): Instances per weight update.
+            buffers (tuple): Buffers from `_buffers`.
+            opt (Optimizer, optional): Defaults to None. Update rule (None for plain SGD).
+
+        Raises:
+            ValueError: If `chunks` are invalid.
+
+        Returns:
+            tuple: (whether any correction was needed, sum of squared output
+                errors of the forward passes made for the updates, number of
+                output values)
+        """
+
+        updated = False
+        sse = 0.0
+        n = 0
+        for datain, dataout in chunks:
+            X = self._input(datain)
+            T = self._output(dataout)
+            # Check that chunk sizes match
+            if len(X) != len(T):
+                raise ValueError('Input and output instance counts do not match.')
+            _updated, _sse = self._epoch(X, T, learn, batch_size, buffers, opt=opt)
+            updated = _updated or updated
+            sse += _sse
+            n += T.size
+        return updated, sse, n
+
+    def _stream_mse(self, chunks):
+        """Compute the output MSE over data read in chunks.
+
+        Args:
+            chunks (iterable): (input data, output data) chunks.
+
+        Returns:
+            float: Output MSE value.
+        """
+
+        n = 0
+        total = 0.0
+        for datain, dataout in chunks:
+            T = self._output(dataout)
+            total += float(np.sum((T - self.test(datain)) ** 2))
+            n += T.size
+        return total / n if n else float('nan')
 
     @method_doc_inherit
-    def train(self, datain, dataout, learn, epochs, normalize=False):
+    def train(self, datain, dataout, learn, epochs, normalize=False, batch_size=1, jobs=1,
+              checkpoint=None, checkpoint_every=10, resume=False,
+              error='exact', error_every=1, error_sample=None,
+              validation=None, tol=None, patience=None, max_time=None, optimizer='sgd'):
+        """Adjust net weights from training data.
+
+        Args:
+            datain (list): Ordered list of input instances to train, or an
+                iterable of (input data, output data) chunks that can be
+                iterated once per epoch (e.g. `DatasetStream`) if `dataout` is None.
+            dataout (list): Ordered list of expected output instances (None for chunks).
+            learn (float): Learning rate to use during training (its valid
+                range depends on `optimizer`).
+            epochs (int): Maximum number of epochs to train.
+            normalize (bool, optional): Defaults to False. Normalize data.
+            batch_size (int, optional): Defaults to 1. Instances per weight update
+                (1 for online training, `len(datain)` or more for full-batch training).
+                Mini-batch corrections are averaged over the batch.
+            jobs (int, optional): Defaults to 1. Worker processes sharing the weights.
+                With mini-batches, every batch is split across them and updates
+                stay synchronous. With online training, each worker runs online
+                updates on its own share of the data at the same time, without
+                locks (Hogwild!), and per-worker throughput is printed.
+                Chunked data can only be trained by a single process.
+            checkpoint (str, optional): Defaults to None. File to save training
+                state to (weights, normalization, epoch, MSE list and random state).
+            checkpoint_every (int, optional): Defaults to 10. Epochs between
+                checkpoints (one is always saved after the last epoch).
+            resume (bool, optional): Defaults to False. Continue training from
+                `checkpoint`, if it exists, instead of starting over.
+            error (str, optional): Defaults to 'exact'. How the MSE of every
+                epoch is tracked: 'exact' runs the net again over the training
+                data after the epoch, while 'online' averages the errors of the
+                forward passes already made for the updates (no extra pass,
+                but weights change along the epoch).
+            error_every (int, optional): Defaults to 1. Epochs between exact
+                MSE values (NaN is recorded for the epochs in between, and the
+                last epoch is always evaluated).
+            error_sample (int, optional): Defaults to None. Compute exact MSE
+                values over a fixed random subsample of this many training
+                instances (None for all of them, not available for chunked data).
+            validation (tuple, optional): Defaults to None. Held-out (input
+                data, output data) whose MSE is monitored after every epoch
+                instead of the training one (or an iterable of such chunks).
+            tol (float, optional): Defaults to None. Minimum decrease of the
+                monitored MSE that counts as an improvement. If given without
+                `patience`, training stops on the first epoch that falls short.
+            patience (int, optional): Defaults to None. Stop after this many
+                evaluated epochs without improvement.
+            max_time (float, optional): Defaults to None. Stop after this many seconds.
+                If any of `validation`, `tol`, `patience` or `max_time` is
+                given, the weights with the lowest monitored MSE are restored
+                at the end (early stopping state is not kept in checkpoints).
+            optimizer (str, optional): Defaults to 'sgd'. Weight update rule
+                (see `neuro.base.optimizer`): 'sgd', 'momentum', 'nesterov',
+                'rmsprop' or 'adam'. Its state is saved in checkpoints. Online
+                training with several jobs only supports 'sgd'. Full-batch
+                'lbfgs' and 'cg' run one line search iteration over the whole
+                data per epoch instead (`batch_size` does not apply, `learn` is
+                the first trial step and their search history is rebuilt after
+                resuming), and cannot train chunked data.
+
+        Returns:
+            list: Output MSE value throughout the epochs.
+
+        Raises:
+            ValueError: If `datain`, `dataout`, `batch_size`, `jobs`,
+                `checkpoint_every`, `checkpoint`, `error`, `error_every`,
+                `error_sample`, `validation`, `tol`, `patience`, `max_time`,
+                `optimizer` or `learn` are invalid.
+        """
+
+        # Chunked data is read again on every epoch
+        streamed = dataout is None
         # Check that data sizes match
-        if len(datain) != len(dataout):
+        if not streamed and len(datain) != len(dataout):
             raise ValueError('Input and output instance counts do not match.')
-        # Check learning rate range
-        if not 0 < learn <= 1:
-            raise ValueError(
-                'Learning rate must be within the interval (0, 1].')
+        # Check learning rate range for the update rule
+        opt = create_optimizer(optimizer, len(self._synapses.params))
+        opt.check(learn)
+        # Check batch size
+        if batch_size < 1:
+            raise ValueError('Batch size must be a positive integer.')
+        # Check number of workers
+        if jobs < 1 or (streamed and jobs > 1):
+            raise ValueError('Number of jobs must be a positive integer (1 for chunked data).')
+        # Asynchronous workers update weights on their own
+        if jobs > 1 and batch_size == 1 and optimizer != 'sgd' and not opt.full_batch:
+            raise ValueError('Online training with several jobs only supports the sgd optimizer.')
+        # Full-batch optimizers evaluate the whole data at once
+        if streamed and opt.full_batch:
+            raise ValueError('Chunked data cannot be trained with the {} optimizer.'.format(optimizer))
+        # Check checkpoint frequency
+        if checkpoint_every < 1:
+            raise ValueError('Checkpoint frequency must be a positive integer.')
+        # Check error tracking settings
+        if error not in ('exact', 'online'):
+            raise ValueError('Invalid error tracking "{}".'.format(error))
+        if error_every < 1:
+            raise ValueError('Error frequency must be a positive integer.')
+        if error_sample is not None and (error_sample < 1 or streamed):
+            raise ValueError('Error sample size must be a positive integer (None for chunked data).')
+        # Check (and start) stopping criteria
+        stopper = EarlyStopping(tol=tol, patience=patience, max_time=max_time)
+        early = any(v is not None for v in (validation, tol, patience, max_time))
+        # Get expected output values
+        if not streamed:
+            T = self._output(dataout)
+        # Resume from checkpoint if required
+        if resume and checkpoint is not None and exists(checkpoint):
+            epoch, mse, stop = self._restore(checkpoint, opt)
+            print('Resuming from epoch {}.'.format(epoch))
+        else:
+            # Normalize input if required
+            if normalize and streamed:
+                self._normalize_stream(datain)
+            elif normalize:
+                self.normalize(datain)
+            # Create list for MSE
+            mse = list()
+            # Initialize stop condition to false
+            stop = False
+            # Initialize current epoch to zero
+            epoch = 0
         # Print initial progress
-        print('Training... 0%', end='\r')
-        # Normalize input if required
-        if normalize:
-            self.normalize(datain)
-        # Create list for MSE
-        mse = list()
-        # Initialize stop condition to false
-        stop = False
-        # Initialize current epoch to zero
-        epoch = 0
-        # Run epochs until stop conditions are met
-        while not stop and epoch < epochs:
-            # Assume stop condition
-            stop = True
-            # For each training pair in data
-            for s, t in zip(datain, dataout):
-                # Check that output sizes match
-                if len(self._y) != len(t):
-                    raise ValueError(
-                        'Instance {} does not match output layer size ({}).'.format(t, len(self._y)))
-                # Create dict for new synapses
-                synapses = deepcopy(self._synapses)
-                # Create history dict
-                hist = dict()
-                # Populate history dict and get output values
-                y = self.test_instance(s, hist=hist)
-                # Initialize list of input deltas
-                δ_in = [t[j] - y[j] for j in range(len(y))]
-                # Create lists for retropropagation
-                names = [NAME_O] + self._hnames[::-1] + [NAME_I]
-                sizes = [self.sizeout] + self.hsizes[::-1] + [self.sizein]
-                # Retropropagation
-                for k in range(len(names) - 1):
-                    # Initialize list for previous layer δ_in
-                    _δ_in = [0] * sizes[k + 1]
-                    # For each cell in current layer
-                    for j in range(sizes[k]):
-                        # If correction is needed
-                        if δ_in[j] != 0:
-                            _zz = '{}{}'.format(names[k], j)
-                            # Get input value from history
-                            zz_in = hist[_zz][0]
-                            # Compute current delta
-                            δ = δ_in[j] * self.df(zz_in)
-                            # Save bias weight correction
-                            synapses[_zz][BIAS_KEY] += learn * δ
-                            # For each cell in previous layer
-                            for i in range(sizes[k + 1]):
-                                _z = '{}{}'.format(names[k + 1], i)
-                                # Get output value from history
-                                z = hist[_z][1]
-                                # Save synaptic weight correction
-                                synapses[_zz][_z] += learn * δ * z
-                                # Accumulate δ_in
-                                _δ_in[i] += δ * self._synapses[_zz][_z]
-                            # Clear stop condition
-                            stop = False
-                    # Set input deltas for previous layer
-                    δ_in = _δ_in
-                # Update synapses
-                self._synapses = synapses
-            # Test dataset at the end of current epoch
-            Y = self.test(datain)
-            # Compute residual sum of squares
-            rss = sum([sum([(dataout[i][j] - Y[i][j]) **
-                            2 for j in range(len(Y[i]))]) / len(Y[0]) for i in range(len(Y))])
-            # Append MSE value after current epoch
-            mse.append(rss / len(Y))
-            # Move to next epoch
-            epoch += 1
-            # Print current progress
-            print('Training... {}%'.format(
-                int(100 * epoch / epochs)), end='\r', flush=True)
-        # Print end of line
-        print()
+        print('Training... {}%'.format(int(100 * epoch / epochs)), end='\r')
+        # Get input layer values
+        if not streamed:
+            X = self._input(datain)
+            # Draw a fixed subsample to evaluate (without touching the random state)
+            if error_sample is not None and error_sample < len(X):
+                i = np.sort(np.random.default_rng(0).choice(len(X), error_sample, replace=False))
+                X_error, T_error = X[i], T[i]
+            else:
+                X_error, T_error = X, T
+        # Get validation layer values
+        if isinstance(validation, tuple):
+            X_valid = self._input(validation[0])
+            T_valid = self._output(validation[1])
+            if len(X_valid) != len(T_valid):
+                raise ValueError('Validation input and output instance counts do not match.')
+        # Allocate buffers
+        buffers = self._buffers()
+        # Plain SGD updates are applied as corrections are computed
+        rule = None if optimizer == 'sgd' else opt
+        # Start workers if required
+        with TrainingPool(self, X, T, jobs) if jobs > 1 else nullcontext() as pool:
+            # Run epochs until stop conditions are met
+            while not stop and epoch < epochs:
+                if streamed:
+                    updated, sse, n = self._stream_epoch(datain, learn, batch_size, buffers, rule)
+                else:
+                    updated, sse = self._epoch(X, T, learn, batch_size, buffers, pool, rule)
+                    n = T.size
+                # Stop if no correction was needed
+                stop = not updated
+                # Move to next epoch
+                epoch += 1
+                # Append MSE value after current epoch
+                if error == 'online':
+                    mse.append(sse / n if n else float('nan'))
+                elif epoch % error_every == 0 or stop or epoch == epochs:
+                    # Test dataset at the end of current epoch
+                    if streamed:
+                        mse.append(self._stream_mse(datain))
+                    else:
+                        Y = self._test(X_error)
+                        mse.append(float(np.mean((T_error - Y) ** 2)))
+                else:
+                    mse.append(float('nan'))
+                # Check stopping criteria on validation or training MSE
+                if early:
+                    if validation is None:
+                        e = mse[-1]
+                    elif isinstance(validation, tuple):
+                        e = float(np.mean((T_valid - self._test(X_valid)) ** 2))
+                    else:
+                        e = self._stream_mse(validation)
+                    stop = stopper.update(epoch, e, self._synapses.params) or stop
+                # Save checkpoint periodically and after the last epoch
+                if checkpoint is not None and (
+                        epoch % checkpoint_every == 0 or stop or epoch == epochs):
+                    self._checkpoint(checkpoint, epoch, mse, stop, opt)
+                # Print current progress
+                print('Training... {}%'.format(
+                    int(100 * epoch / epochs)), end='\r', flush=True)
+            # Print end of line
+            print()
+            # Print asynchronous workers throughput
+            if pool is not None and batch_size == 1:
+                for i, v in enumerate(pool.throughput()):
+                    print('Worker {}: {:.1f} instances/second'.format(i, v))
+        # Restore best weights
+        if early and stopper.restore(self._synapses.params):
+            if stopper.reason is not None:
+                print('Stopped at epoch {}: {}.'.format(epoch, stopper.reason))
+            print('Best epoch: {} (MSE {}).'.format(stopper.best_epoch, stopper.best))
+            # Keep the checkpoint in line with the net
+            if checkpoint is not None:
+                self._checkpoint(checkpoint, epoch, mse, stop, opt)
         # Return MSE list
         return mse
 
+    def _header(self):
+        """Get the settings needed to rebuild the net.
+
+        Returns:
+            dict: Class, name, layer sizes, activation, normalization flag and
+                number of instances behind the normalization statistics.
+        """
+
+        return dict(cls=type(self).__name__, name=self.name, sizein=self.sizein,
+                    sizeout=self.sizeout, hsizes=self.hsizes, activation=self.activation,
+                    normalize=self._normalize,
+                    count=self._stats.count if self._stats is not None else 0)
+
+    def _arrays(self):
+        """Get the arrays needed to rebuild the net.
+
+        Returns:
+            list: Weights, normalization means and deviations, and sums of
+                squared deviations (to keep updating normalization statistics).
+        """
+
+        m2 = self._stats.m2 if self._stats is not None else np.zeros(self.sizein)
+        return [self._synapses.params, self._μ, self._σ, m2]
+
+    def _restore_normalization(self, header, arrays):
+        """Restore normalization from arrays read from a binary file.
+
+        Args:
+            header (dict): Header, as returned by `_header`.
+            arrays (list): Arrays, as returned by `_arrays`.
+        """
+
+        μ, σ = arrays[1:3]
+        self._normalize = header['normalize']
+        self._μ = μ.tolist()
+        self._σ = σ.tolist()
+        # Files without statistics only hold means and deviations
+        self._stats = None
+        if header.get('count'):
+            self._stats = RunningStats(self.sizein, header['count'], μ, arrays[3])
+
+    def _checkpoint(self, filename, epoch, mse, stop, opt):
+        """Save training state to a binary file (see `save`).
+
+        The file is replaced atomically, so it always holds a whole checkpoint.
+
+        Args:
+            filename (str): Output file.
+            epoch (int): Epochs trained so far.
+            mse (list): Output MSE value throughout the epochs.
+            stop (bool): Whether the stop condition was met.
+            opt (Optimizer): Update rule (its state is saved after the weights).
+        """
+
+        header = dict(self._header(), epoch=epoch, stop=stop, random=getstate(),
+                      optimizer=opt.name, steps=opt.steps)
+        store.write(filename, header, self._arrays() + opt.state() + [mse])
+
+    def _restore(self, filename, opt):
+        """Restore training state saved with `_checkpoint`.
+
+        Args:
+            filename (str): Input file.
+            opt (Optimizer): Update rule to restore the state of.
+
+        Raises:
+            ValueError: If `filename` is not a checkpoint for this net and optimizer.
+
+        Returns:
+            tuple: (epoch, mse, stop)
+        """
+
+        header, arrays = store.read(filename)
+        # Check that the checkpoint belongs to this net
+        if 'epoch' not in header or any(
+                header.get(k, v) != v for k, v in self._header().items()
+                if k not in ('name', 'normalize', 'count')):
+            raise ValueError('"{}" is not a checkpoint for this net.'.format(filename))
+        # Checkpoints without optimizer were saved by plain SGD
+        if header.get('optimizer', 'sgd') != opt.name:
+            raise ValueError('"{}" was saved with the {} optimizer, not {}.'.format(
+                filename, header['optimizer'], opt.name))
+        params, mse = arrays[0], arrays[-1]
+        # Restore weights, normalization and optimizer state
+        self._synapses.params[:] = params
+        self._restore_normalization(header, arrays)
+        opt.restore(header.get('steps', 0), arrays[4:-1])
+        # Restore random state
+        version, state, gauss = header['random']
+        setstate((version, tuple(state), gauss))
+        return header['epoch'], mse.tolist(), header['stop']
+
+    def save(self, filename):
+        """Save the net (weights, layer sizes and normalization) to a binary file.
+
+        Normalization statistics are saved too, so they can keep being updated
+        after loading (see `update_normalization`). Checkpoints saved during
+        training can be loaded as well.
+
+        Args:
+            filename (str): Output file.
+        """
+
+        store.write(filename, self._header(), self._arrays())
+
+    @classmethod
+    def load(cls, filename):
+        """Load a net saved with `save` (or a training checkpoint).
+
+        Weights are memory mapped from the file instead of being read.
+
+        Args:
+            filename (str): Input file.
+
+        Raises:
+            ValueError: If `filename` is not a valid model file for this class.
+
+        Returns:
+            MLPerceptron: Loaded net.
+        """
+
+        header, arrays = store.read(filename)
+        params, μ = arrays[:2]
+        # Check that the file holds a net of this class
+        if header['cls'] != cls.__name__:
+            raise ValueError('"{}" holds a net of class {}, not {}.'.format(
+                filename, header['cls'], cls.__name__))
+        # Files without activation use the class default
+        kwargs = dict(activation=header['activation']) if 'activation' in header else dict()
+        p = cls(header['name'], header['sizein'], header['sizeout'], header['hsizes'], **kwargs)
+        # Check that the layer sizes match the weights
+        if len(params) != CompiledSynapses.count(p._sizes) or len(μ) != p.sizein:
+            raise ValueError('"{}" is corrupt.'.format(filename))
+        # Use mapped weights
+        p._synapses = CompiledSynapses(p._names, p._sizes, params)
+        p._restore_normalization(header, arrays)
+        return p
+
     @method_doc_inherit
     def f(self, y):
-        # Watch out for overflows
-        try:
-            return 2 / (1 + exp(-y)) - 1
-        # If exponential overflow
-        except OverflowError:
-            # Saturate accordingly
-            if y < 0:
-                return -1.0
-            else:
-                return 1.0
+        """Net-wide transfer function.
+
+        Args:
+            y (float): Input signal.
+
+        Returns:
+            float: Output.
+        """
 
+        return float(self._activation.f(np.array([y], dtype=float))[0])
 
     def df(self, y):
         """Net-wide transfer function derivative.
@@ -177,4 +917,5 @@ class MLPerceptron(Net):
             float: Output.
         """
 
-        return (1 + self.f(y)) * (1 - self.f(y)) / 2
+        a = np.array([y], dtype=float)
+        return float(self._activation.df(a, self._activation.f(a))[0])
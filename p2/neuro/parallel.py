@@ -0,0 +1,203 @@
+# !/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Parallel training helpers.
+"""
+
+from os import getpid
+from time import perf_counter
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from neuro.base.compiled import CompiledSynapses
+
+# Worker process state (set by the pool initializer)
+_worker = dict()
+
+
+def _attach(net, weights, grads, jobs, X, T):
+    """Pool initializer: bind a net copy to the shared buffers.
+
+    Args:
+        net (MLPerceptron): Net to compute corrections for.
+        weights (str): Shared memory block name for synaptic weights.
+        grads (str): Shared memory block name for correction slots.
+        jobs (int): Number of worker processes.
+        X (numpy.ndarray): Input layer values (already normalized).
+        T (numpy.ndarray): Expected output instances.
+    """
+
+    s = net._synapses
+    _worker['weights'] = SharedMemory(name=weights)
+    _worker['grads'] = SharedMemory(name=grads)
+    # Read weights straight from shared memory
+    net._synapses = CompiledSynapses(s.names, s.sizes, _worker['weights'].buf)
+    _worker['net'] = net
+    _worker['slots'] = [CompiledSynapses(s.names, s.sizes, b) for b in np.ndarray(
+        (jobs, len(s.params)), buffer=_worker['grads'].buf)]
+    _worker['buffers'] = net._buffers()
+    _worker['X'] = X
+    _worker['T'] = T
+
+
+def _gradient(task):
+    """Pool task: sum corrections for a shard of instances into a slot.
+
+    Args:
+        task (tuple): (slot, first instance, last instance + 1)
+
+    Returns:
+        tuple: (whether any correction was needed, sum of squared output errors)
+    """
+
+    j, lo, hi = task
+    e = _worker['net']._gradient(
+        _worker['X'][lo:hi], _worker['T'][lo:hi], _worker['slots'][j])
+    return bool(e.any()), float(np.vdot(e, e))
+
+
+def _online(task):
+    """Pool task: run online training for a shard straight on shared weights.
+
+    Updates are applied without any locking (Hogwild!), so other workers may
+    read weights while they are being written.
+
+    Args:
+        task (tuple): (first instance, last instance + 1, learning rate)
+
+    Returns:
+        tuple: (process id, instances, seconds, whether any correction was
+            needed, sum of squared output errors)
+    """
+
+    lo, hi, learn = task
+    t0 = perf_counter()
+    updated, sse = _worker['net']._epoch(_worker['X'][lo:hi], _worker['T'][lo:hi],
+                                        learn, 1, _worker['buffers'])
+    return getpid(), hi - lo, perf_counter() - t0, updated, sse
+
+
+class TrainingPool:
+    """Pool of processes training a net whose weights live in shared memory.
+
+    Every update made by the parent process or by a worker is seen by all of
+    them without sending the weights again. Workers either sum corrections
+    for shards of a mini-batch (synchronous data parallelism) or run online
+    updates for shards of the data at the same time (asynchronous, lock-free).
+
+    Attributes:
+        jobs (int): Number of worker processes.
+    """
+
+    jobs = None
+
+    _count = None
+    _work = None
+    _net = None
+    _private = None
+    _weights = None
+    _grads = None
+    _slots = None
+    _pool = None
+
+    def __init__(self, net, X, T, jobs):
+        """Constructor.
+
+        Args:
+            net (MLPerceptron): Net to train.
+            X (numpy.ndarray): Input layer values (already normalized).
+            T (numpy.ndarray): Expected output instances.
+            jobs (int): Number of worker processes.
+        """
+
+        self.jobs = jobs
+        self._count = len(X)
+        self._work = dict()
+        self._net = net
+        self._private = net._synapses
+        n = len(self._private.params)
+        # Move weights to shared memory
+        self._weights = SharedMemory(create=True, size=self._private.params.nbytes)
+        net._synapses = CompiledSynapses(
+            self._private.names, self._private.sizes, self._weights.buf)
+        net._synapses.params[:] = self._private.params
+        # Create one shared correction slot per worker
+        self._grads = SharedMemory(create=True, size=jobs * self._private.params.nbytes)
+        self._slots = np.ndarray((jobs, n), buffer=self._grads.buf)
+        # Start workers (data is sent once, at start up)
+        self._pool = Pool(jobs, initializer=_attach, initargs=(
+            net, self._weights.name, self._grads.name, jobs, X, T))
+
+    def gradient(self, lo, hi, grad):
+        """Sum corrections for a batch of instances across the workers.
+
+        Args:
+            lo (int): First instance of the batch.
+            hi (int): Last instance of the batch (exclusive).
+            grad (CompiledSynapses): Buffer where the summed corrections are written.
+
+        Returns:
+            tuple: (whether any correction was needed, sum of squared output errors)
+        """
+
+        # Split batch in one shard per worker
+        bounds = np.linspace(lo, hi, self.jobs + 1).astype(int)
+        tasks = [(j, bounds[j], bounds[j + 1]) for j in range(self.jobs)]
+        # Wait for every shard and reduce corrections
+        results = self._pool.map(_gradient, tasks)
+        np.sum(self._slots, axis=0, out=grad.params)
+        return any(r[0] for r in results), sum(r[1] for r in results)
+
+    def online(self, learn):
+        """Run an asynchronous online epoch, with one shard of data per worker.
+
+        Args:
+            learn (float): Learning rate.
+
+        Returns:
+            tuple: (whether any correction was needed, sum of squared output errors)
+        """
+
+        # Split data in one shard per worker
+        bounds = np.linspace(0, self._count, self.jobs + 1).astype(int)
+        tasks = [(bounds[j], bounds[j + 1], learn) for j in range(self.jobs)]
+        # Wait for every shard
+        results = self._pool.map(_online, tasks, chunksize=1)
+        # Accumulate work done by each process
+        for pid, n, t, _, _ in results:
+            w = self._work.setdefault(pid, [0, 0.0])
+            w[0] += n
+            w[1] += t
+        return any(r[3] for r in results), sum(r[4] for r in results)
+
+    def throughput(self):
+        """Get the online training throughput of every worker.
+
+        Returns:
+            list: Instances per second for each worker process.
+        """
+
+        return [n / t if t else 0.0 for n, t in self._work.values()]
+
+    def close(self):
+        """Stop workers and move the weights back to private memory.
+        """
+
+        self._pool.close()
+        self._pool.join()
+        # Copy final weights back
+        self._private.params[:] = self._net._synapses.params
+        self._net._synapses = self._private
+        # Release shared memory
+        del self._slots
+        self._weights.close()
+        self._weights.unlink()
+        self._grads.close()
+        self._grads.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,258 @@
+# !/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Hyperparameter sweeps.
+"""
+
+from contextlib import redirect_stdout
+from io import StringIO
+from itertools import product
+from math import floor
+from multiprocessing import Pool
+from random import seed, shuffle
+from time import time
+
+import numpy as np
+
+from neuro.ml_perceptron import MLPerceptron
+
+# Dataset shared by the worker processes (set by the pool initializer)
+_data = dict()
+
+
+def grid(sizes, init, learn, epochs, normalize):
+    """Build every configuration for given hyperparameter values.
+
+    Args:
+        sizes (list): Lists of hidden layers sizes.
+        init (list): Weight initialization boundaries.
+        learn (list): Learning rates.
+        epochs (list): Maximum numbers of epochs.
+        normalize (list): Whether to normalize data.
+
+    Returns:
+        list: Configurations (dicts with one value per hyperparameter).
+    """
+
+    keys = ('sizes', 'init', 'learn', 'epochs', 'normalize')
+    return [dict(zip(keys, v)) for v in product(sizes, init, learn, epochs, normalize)]
+
+
+def split(data, ratio):
+    """Split data randomly for given ratio.
+
+    Args:
+        data (tuple): (input data, output data)
+        ratio (float): Ratio for the first partition.
+
+    Raises:
+        ValueError: If `ratio` is invalid.
+
+    Returns:
+        tuple: (first partition, second partition)
+    """
+
+    count = len(data[0])
+    # Get index for split
+    index = int(floor(ratio * count))
+    # Check that split index is valid
+    if not 0 < index < count:
+        raise ValueError("Invalid ratio. Empty partition.")
+    # Create shuffled list of indices
+    indices = list(range(count))
+    shuffle(indices)
+    # Create partitions
+    first = tuple([d[i] for i in indices[:index]] for d in data)
+    second = tuple([d[i] for i in indices[index:]] for d in data)
+    return first, second
+
+
+def _load(sizein, sizeout, train, test, valid=None):
+    """Pool initializer: keep the dataset for the worker process.
+
+    Args:
+        sizein (int): Input layer size.
+        sizeout (int): Output layer size.
+        train (tuple): (input data, output data) for train.
+        test (tuple): (input data, output data) for test.
+        valid (tuple, optional): Defaults to None. (input data, output data) for validation.
+    """
+
+    _data['sizes'] = sizein, sizeout
+    _data['train'] = train
+    _data['test'] = test
+    _data['valid'] = valid
+    # Forked workers must not share random state
+    seed()
+
+
+def run(config):
+    """Train and score a net for a configuration.
+
+    Args:
+        config (dict): Configuration (as built by `grid`).
+
+    Returns:
+        dict: Configuration with 'train', 'test', 'mse' and 'time' results.
+    """
+
+    sizein, sizeout = _data['sizes']
+    train, test = _data['train'], _data['test']
+    p = MLPerceptron('MLPerceptron', sizein, sizeout, config['sizes'])
+    p.randomize_synapses(-config['init'], config['init'])
+    t0 = time()
+    # Silence training progress
+    with redirect_stdout(StringIO()):
+        mse = p.train(train[0], train[1], config['learn'], config['epochs'],
+                      normalize=config['normalize'])
+    t = time() - t0
+    result = dict(config)
+    result['train'] = p.stats(train[0], train[1])[0]
+    result['test'] = p.stats(test[0], test[1])[0]
+    result['mse'] = mse
+    result['time'] = t
+    return result
+
+
+def sweep(configs, sizein, sizeout, train, test, jobs=None):
+    """Run configurations across a pool of processes.
+
+    The dataset is sent once to each worker, not once per configuration.
+
+    Args:
+        configs (list): Configurations (as built by `grid`).
+        sizein (int): Input layer size.
+        sizeout (int): Output layer size.
+        train (tuple): (input data, output data) for train.
+        test (tuple): (input data, output data) for test.
+        jobs (int, optional): Defaults to None. Worker processes (None for one per CPU).
+
+    Returns:
+        list: Results (as returned by `run`), in the same order as `configs`.
+    """
+
+    with Pool(jobs, initializer=_load, initargs=(sizein, sizeout, train, test)) as pool:
+        results = list()
+        # Report progress as configurations finish
+        for i, r in enumerate(pool.imap(run, configs)):
+            results.append(r)
+            print('Sweeping... {}/{}'.format(i + 1, len(configs)),
+                  end='\r', flush=True)
+        print()
+    return results
+
+
+def _advance(task):
+    """Resume training of a configuration for some more epochs.
+
+    Args:
+        task (tuple): (entry, epochs), where entry is a configuration with
+            its current 'net' (None to start from scratch) and results so far.
+
+    Returns:
+        dict: Updated entry with 'net', 'epochs', 'mse', 'valid', 'train', 'test' and 'time'.
+    """
+
+    entry, epochs = task
+    entry = dict(entry)
+    sizein, sizeout = _data['sizes']
+    train, test, valid = _data['train'], _data['test'], _data['valid']
+    # Create the net on the first rung, resume it afterwards
+    p = entry['net']
+    if p is None:
+        p = MLPerceptron('MLPerceptron', sizein, sizeout, entry['sizes'])
+        p.randomize_synapses(-entry['init'], entry['init'])
+    t0 = time()
+    # Silence training progress
+    with redirect_stdout(StringIO()):
+        mse = p.train(train[0], train[1], entry['learn'], epochs,
+                      normalize=entry['normalize'])
+    entry['time'] += time() - t0
+    entry['net'] = p
+    entry['epochs'] += epochs
+    entry['mse'] = entry['mse'] + mse
+    entry['valid'] = float(np.mean((np.asarray(valid[1]) - p.test(valid[0])) ** 2))
+    entry['train'] = p.stats(train[0], train[1])[0]
+    entry['test'] = p.stats(test[0], test[1])[0]
+    return entry
+
+
+def halving(configs, sizein, sizeout, train, valid, test, epochs, min_epochs, eta=3, jobs=None):
+    """Run configurations with successive halving across a pool of processes.
+
+    Every configuration starts with a budget of `min_epochs`. At each rung only
+    the best `1/eta` of them (by validation MSE) survive, and they resume
+    training from their current weights until the budget is multiplied by
+    `eta`, up to `epochs`.
+
+    Args:
+        configs (list): Configurations (as built by `grid`, 'epochs' is ignored).
+        sizein (int): Input layer size.
+        sizeout (int): Output layer size.
+        train (tuple): (input data, output data) for train.
+        valid (tuple): (input data, output data) for validation.
+        test (tuple): (input data, output data) for test.
+        epochs (int): Maximum number of epochs for any configuration.
+        min_epochs (int): Number of epochs for every configuration on the first rung.
+        eta (int, optional): Defaults to 3. Reduction factor between rungs.
+        jobs (int, optional): Defaults to None. Worker processes (None for one per CPU).
+
+    Raises:
+        ValueError: If `epochs`, `min_epochs` or `eta` are invalid.
+
+    Returns:
+        list: Results (as returned by `run`, plus 'valid' MSE and final 'net'),
+            in the same order as `configs`.
+    """
+
+    if not 0 < min_epochs <= epochs:
+        raise ValueError('Invalid epoch budgets.')
+    if eta < 2:
+        raise ValueError('Reduction factor must be at least 2.')
+    # Initialize entries for every configuration
+    results = [dict(config, net=None, epochs=0, mse=[], time=0.0)
+               for config in configs]
+    alive = list(range(len(results)))
+    budget = min_epochs
+    rung = 0
+    with Pool(jobs, initializer=_load, initargs=(sizein, sizeout, train, test, valid)) as pool:
+        while True:
+            # Train survivors up to current budget
+            tasks = [(results[i], budget - results[i]['epochs']) for i in alive]
+            for i, r in zip(alive, pool.map(_advance, tasks)):
+                results[i] = r
+            print('Rung {}: {} configurations trained for {} epochs.'.format(
+                rung, len(alive), budget))
+            # Stop when budget is exhausted (a single survivor keeps training up to it)
+            if budget >= epochs:
+                break
+            # Keep the best configurations by validation MSE
+            alive.sort(key=lambda i: results[i]['valid'])
+            alive = sorted(alive[:max(1, len(alive) // eta)])
+            budget = min(budget * eta, epochs)
+            rung += 1
+    return results
+
+
+def write_table(results, filename):
+    """Write sweep results as a tab separated table.
+
+    Args:
+        results (list): Results (as returned by `run`).
+        filename (str): Output file.
+    """
+
+    with open(filename, 'w') as file:
+        file.write('\t'.join(['sizes', 'init', 'learn', 'epochs', 'normalize',
+                              'train', 'test', 'valid', 'time', 'mse']) + '\n')
+        for r in results:
+            file.write('\t'.join([
+                ','.join(str(s) for s in r['sizes']),
+                str(r['init']),
+                str(r['learn']),
+                str(r['epochs']),
+                str(int(r['normalize'])),
+                str(r['train']),
+                str(r['test']),
+                str(r.get('valid', '')),
+                '{:.3f}'.format(r['time']),
+                ','.join(str(e) for e in r['mse'])]) + '\n')
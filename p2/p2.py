@@ -6,8 +6,11 @@
 from time import time
 from pprint import pprint
 
-from neuro.parser import Parser, mode1, mode2, mode3
+from neuro.parser import Parser, mode1, mode2, mode3, modeK, holdout
 from neuro.ml_perceptron import MLPerceptron
+from neuro.crossval import cross_validate, summary
+from neuro.predict import predict, bipolar
+from neuro.writer import Writer
 
 _COURSE_ = 'NEUROCOMPUTACIÓN'
 _YEAR_ = '2017-2018'
@@ -38,29 +41,80 @@ def main():
 
     args = vars(parser.parse_args())
 
-    sizes = [int(s) for s in args['sizes']]
-    init = float(args['init'])
-    learn = float(args['learn'])
-    epochs = int(args['epochs'])
     normalize = args['normalize']
+    batch = int(args['batch'])
+    jobs = int(args['jobs']) if args['jobs'] else None
+    every = int(args['checkpoint_every'])
+    error_every = int(args['error_every'])
+    error_sample = int(args['error_sample']) if args['error_sample'] else None
+    tol = float(args['tol']) if args['tol'] else None
+    patience = int(args['patience']) if args['patience'] else None
+    max_time = float(args['max_time']) if args['max_time'] else None
+    # Training settings are not needed for a saved model
+    if not args['load']:
+        sizes = [int(s) for s in args['sizes']]
+        init = float(args['init'])
+        learn = float(args['learn'])
+        epochs = int(args['epochs'])
+
+    if args['mode'] == 'modeK':
+        sizein, sizeout, ds, folds = modeK(
+            args['data'], args['folds'], stratified=args['stratified'])
+        config = dict(sizes=sizes, init=init, learn=learn, epochs=epochs,
+                      normalize=normalize, batch_size=batch, optimizer=args['optimizer'])
+        print()
+        t0 = time()
+        stats = cross_validate(MLPerceptron, config, ds, folds, jobs=jobs)
+        t = time()
+        print('Elapsed time: {0:.3f} seconds'.format(t - t0))
+        print()
+        for i, (score, _) in enumerate(stats):
+            print('Fold {} Score: {}'.format(i, score))
+        print('Mean Score: {} ± {}'.format(*summary([s[0] for s in stats])))
+        # Accumulate confussion matrices over the folds
+        m = [[sum(c) for c in zip(*rows)] for rows in zip(*[s[1] for s in stats])]
+        print('Confussion Matrix:')
+        prettymatrix(m)
+        return
 
     if args['mode'] == 'mode1':
         sizein, sizeout, train, test = mode1(args['data'], args['ratio'])
     elif args['mode'] == 'mode2':
         sizein, sizeout, train, test = mode2(args['data'])
     elif args['mode'] == 'mode3':
-        sizein, sizeout, train, test = mode3(args['train'], args['test'])
-
-    p = MLPerceptron('MLPerceptron', sizein, sizeout, sizes)
-    p.randomize_synapses(-init, init)
-
-    print()
-    t0 = time()
-    p.train(train[0], train[1], learn, epochs, normalize=normalize)
-    t = time()
-    print()
-    print('Elapsed time: {0:.3f} seconds'.format(t - t0))
-    print()
+        sizein, sizeout, train, test = mode3(
+            args['train'], args['test'], chunk_size=args['chunk'])
+
+    # Hold out validation data for early stopping if required
+    validation = None
+    if args['validation'] and not args['load']:
+        train, validation = holdout(train, args['validation'])
+
+    # Load a saved model or train a new one
+    if args['load']:
+        p = MLPerceptron.load(args['load'])
+        print('Model was loaded from \'{}\'.'.format(args['load']))
+        print()
+    else:
+        p = MLPerceptron('MLPerceptron', sizein, sizeout, sizes)
+        p.randomize_synapses(-init, init)
+
+        print()
+        t0 = time()
+        p.train(train[0], train[1], learn, epochs, normalize=normalize,
+                batch_size=batch, jobs=jobs or 1,
+                checkpoint=args['checkpoint'], checkpoint_every=every,
+                resume=args['resume'], error=args['error'],
+                error_every=error_every, error_sample=error_sample,
+                validation=validation, tol=tol, patience=patience, max_time=max_time,
+                optimizer=args['optimizer'])
+        t = time()
+        print()
+        print('Elapsed time: {0:.3f} seconds'.format(t - t0))
+        print()
+    if args['save']:
+        p.save(args['save'])
+        print('Model was saved to \'{}\'.'.format(args['save']))
 
     score, m = p.stats(train[0], train[1])
 
@@ -72,15 +126,13 @@ def main():
         print('Test Score:', score)
     elif args['mode'] == 'mode3':
         f = args['output']
-        res = p.test(test[0])
-        with open(f, 'w') as fileout:
-            fileout.write('{} {}\n'.format(sizein, sizeout))
-            for i in range(len(res)):
-                x = ' '.join([str(x) for x in test[0][i]])
-                r = [-1] * len(res[i])
-                r[res[i].index(max(res[i]))] = 1
-                y = ' '.join([str(y) for y in r])
-                fileout.write('{} {}\n'.format(x, y))
+        precision = int(args['precision']) if args['precision'] else None
+        # Predict test instances chunk by chunk
+        with Writer(f, header='{} {}'.format(sizein, sizeout),
+                    precision=precision) as fileout:
+            for x, _, res in predict(p, test):
+                # Encode predicted classes in bipolar form
+                fileout.write(x, bipolar(res))
         print('Test predictions were written to \'{}\'.'.format(f))
 
     print('Confussion Matrix:')
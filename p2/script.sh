@@ -1,6 +1 @@
-../../pypy3-v5.10.1-linux64/bin/pypy3 p2.py -s 2 -i 1 -l 0.1 -e 100 -z mode1 -d ./data/problema_real6.txt -r 0.7
-../../pypy3-v5.10.1-linux64/bin/pypy3 p2.py -s 2 -i 1 -l 0.25 -e 100 -z mode1 -d ./data/problema_real6.txt -r 0.7
-../../pypy3-v5.10.1-linux64/bin/pypy3 p2.py -s 2 -i 1 -l 0.5 -e 100 -z mode1 -d ./data/problema_real6.txt -r 0.7
-../../pypy3-v5.10.1-linux64/bin/pypy3 p2.py -s 2 -i 1 -l 0.75 -e 100 -z mode1 -d ./data/problema_real6.txt -r 0.7
-../../pypy3-v5.10.1-linux64/bin/pypy3 p2.py -s 2 -i 1 -l 1.0 -e 100 -z mode1 -d ./data/problema_real6.txt -r 0.7
-
+python3 sweep.py -s 2 -i 1 -l 0.1 0.25 0.5 0.75 1.0 -e 100 -z 1 -o sweep_problema_real6.tsv mode1 -d ./data/problema_real6.txt -r 0.7
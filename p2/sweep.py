@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Hyperparameter sweep program.
+"""
+
+from argparse import ArgumentParser, RawTextHelpFormatter
+from time import time
+
+from neuro.dataset import Dataset
+from neuro.parser import mode1, mode2, mode3
+from neuro.sweep import grid, split, sweep, halving, write_table
+
+_COURSE_ = 'NEUROCOMPUTACIÓN'
+_YEAR_ = '2017-2018'
+_TITLE_ = 'Práctica 2: Barrido de hiperparámetros'
+_PAIR_ = 'Pareja 08'
+_AUTHORS_ = ['Sergio Fuentes', 'Adrián Muñoz']
+
+
+def build_parser():
+    """Build the argument parser.
+
+    Returns:
+        ArgumentParser: Parser.
+    """
+
+    desc = (
+        '{} {}\n'
+        '{}\n'
+        '{}: {}'
+    ).format(_COURSE_, _YEAR_, _TITLE_, _PAIR_, ', '.join(_AUTHORS_))
+    parser = ArgumentParser(description=desc,
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument(
+        '-s', '--sizes', help='hidden layers sizes to try, comma separated (e.g. \'2 4 2,2\')', required=True, nargs='+')
+    parser.add_argument(
+        '-i', '--init', help='weight initialization boundaries to try', required=True, nargs='+')
+    parser.add_argument(
+        '-l', '--learn', help='learning rates to try', required=True, nargs='+')
+    parser.add_argument(
+        '-e', '--epochs', help='maximum numbers of training epochs to try', required=True, nargs='+')
+    parser.add_argument(
+        '-z', '--normalize', help='normalization settings to try (0 => no, 1 => yes)', nargs='+', default=['0'], choices=['0', '1'])
+    parser.add_argument(
+        '-H', '--halving', help='successive halving reduction factor (e.g. \'3\' => keep best third on each rung)', default=None)
+    parser.add_argument(
+        '-m', '--min_epochs', help='epochs on the first successive halving rung (default: 1)', default='1')
+    parser.add_argument(
+        '-v', '--valid', help='ratio of train data held out to rank configurations in successive halving (default: 0.2)', default='0.2')
+    parser.add_argument(
+        '-j', '--jobs', help='worker processes (default: one per CPU)', default=None)
+    parser.add_argument(
+        '-o', '--output', help='Output file for the results table', required=True)
+
+    # Create subparsers
+    sp = parser.add_subparsers(dest='mode', help='Working mode')
+    sp.required = True
+
+    # Mode 1 subparser
+    p = sp.add_parser(
+        'mode1', help='1 file. Random partitions for train and test (same for every configuration).')
+    p.add_argument('-d', '--data', help='Dataset file', required=True)
+    p.add_argument(
+        '-r', '--ratio', help='Ratio for train (e.g. \'0.2\' => 20%% train, 80%% test)', required=True)
+
+    # Mode 2 subparser
+    p = sp.add_parser(
+        'mode2', help='1 file. Full partition for both train and test.')
+    p.add_argument('-d', '--data', help='Dataset file', required=True)
+
+    # Mode 3 subparser
+    p = sp.add_parser(
+        'mode3', help='2 files. Separate partitions for train and test.')
+    p.add_argument('-d', '--train', help='Train dataset file', required=True)
+    p.add_argument('-t', '--test', help='Test dataset file', required=True)
+
+    return parser
+
+
+def main():
+    """Main function.
+    """
+
+    args = vars(build_parser().parse_args())
+
+    epochs = [int(e) for e in args['epochs']]
+    # Successive halving drives epochs itself, up to the largest value
+    if args['halving']:
+        epochs = [max(epochs)]
+    configs = grid([[int(s) for s in sizes.split(',')] for sizes in args['sizes']],
+                   [float(i) for i in args['init']],
+                   [float(l) for l in args['learn']],
+                   epochs,
+                   [z == '1' for z in args['normalize']])
+    jobs = int(args['jobs']) if args['jobs'] else None
+
+    # Load the dataset once for every configuration
+    if args['mode'] == 'mode1':
+        sizein, sizeout, train, test = mode1(args['data'], args['ratio'])
+    elif args['mode'] == 'mode2':
+        sizein, sizeout, train, test = mode2(args['data'])
+    elif args['mode'] == 'mode3':
+        sizein, sizeout, train, _ = mode3(args['train'], args['test'])
+        # Every configuration is scored on the whole test set, so keep it in memory
+        test = Dataset(args['test']).data()
+
+    # Hold out part of train data to rank configurations
+    if args['halving']:
+        train, valid = split(train, 1 - float(args['valid']))
+        print('- Validation instances: {}'.format(len(valid[0])))
+
+    print('- Configurations: {}'.format(len(configs)))
+    print()
+    t0 = time()
+    if args['halving']:
+        results = halving(configs, sizein, sizeout, train, valid, test, epochs[0],
+                          int(args['min_epochs']), eta=int(args['halving']), jobs=jobs)
+    else:
+        results = sweep(configs, sizein, sizeout, train, test, jobs=jobs)
+    t = time()
+    print()
+    print('Elapsed time: {0:.3f} seconds'.format(t - t0))
+    print()
+
+    write_table(results, args['output'])
+    print('Results were written to \'{}\'.'.format(args['output']))
+
+    # Pick the last survivor when halving, otherwise rank by test score
+    if args['halving']:
+        best = min(results, key=lambda r: (-r['epochs'], r['valid']))
+    else:
+        best = max(results, key=lambda r: r['test'])
+    print('Best configuration: -s {} -i {} -l {} -e {}{}'.format(
+        ' '.join(str(s) for s in best['sizes']), best['init'], best['learn'],
+        best['epochs'], ' -z' if best['normalize'] else ''))
+    print('Train Score:', best['train'])
+    print('Test Score:', best['test'])
+
+
+if __name__ == "__main__":
+    main()
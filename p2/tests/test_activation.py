@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""Tests for activation functions.
+"""
+
+import numpy as np
+import pytest
+
+from neuro.base.activation import ACTIVATIONS, Activation, get
+
+
+def test_incomplete_activation_cannot_be_created():
+    class Half(Activation):
+        name = 'half'
+
+        def f(self, y, out=None):
+            return np.multiply(y, 0.5, out=out)
+
+    with pytest.raises(TypeError):
+        Half()
+
+
+@pytest.mark.parametrize('name', sorted(ACTIVATIONS))
+def test_kernels_write_to_buffers(name):
+    act = get(name)
+    y = np.linspace(-3, 3, 7)
+    z = act.f(y)
+    out = np.empty_like(y)
+    assert act.f(y, out=out) is out
+    assert np.array_equal(out, z)
+    assert act.df(y, z, out=out) is out
+    assert np.array_equal(out, act.df(y, z))
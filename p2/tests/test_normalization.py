@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""Tests for input normalization.
+"""
+
+import numpy as np
+
+from neuro.ml_perceptron import MLPerceptron
+
+
+def test_constant_column_is_only_centered():
+    X = np.array([[0.0, 2.0], [1.0, 2.0], [2.0, 2.0]])
+    p = MLPerceptron('m', 2, 1, [2])
+    p.normalize(X)
+    assert p._σ[1] == 1
+    a = p._input(X)
+    assert np.all(np.isfinite(a))
+    assert np.array_equal(a[:, 1], np.zeros(3))
+    assert np.all(np.isfinite(p.test(X)))
+
+
+def test_update_normalization_with_constant_column():
+    p = MLPerceptron('m', 2, 1, [2])
+    p.update_normalization([[0.0, 5.0], [1.0, 5.0]])
+    p.update_normalization([[2.0, 5.0]])
+    assert p._σ[1] == 1
+    assert np.all(np.isfinite(p.test([[0.5, 5.0]])))
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Tests for optimizers.
+"""
+
+import numpy as np
+import pytest
+
+from neuro.base.optimizer import OPTIMIZERS, LineSearch, Optimizer, create
+
+
+def test_incomplete_optimizer_cannot_be_created():
+    class Idle(Optimizer):
+        name = 'idle'
+
+    with pytest.raises(TypeError):
+        Idle(3)
+
+
+@pytest.mark.parametrize('name', [n for n, c in OPTIMIZERS.items() if not c.full_batch])
+def test_state_round_trip(name):
+    a = create(name, 4)
+    params = np.zeros(4)
+    a.step(params, np.array([1.0, -1.0, 0.5, 0.0]), 0.01)
+    b = create(name, 4)
+    b.restore(a.steps, [s.copy() for s in a.state()])
+    assert b.steps == a.steps
+    for x, y in zip(a.state(), b.state()):
+        assert np.array_equal(x, y)
+
+
+def test_learning_rate_range_follows_optimizer():
+    create('sgd', 1).check(1.0)
+    create('momentum', 1).check(0.1)
+    with pytest.raises(ValueError):
+        create('momentum', 1).check(0.25)
+
+
+def test_line_search_without_direction_cannot_be_created():
+    class Blind(LineSearch):
+        name = 'blind'
+
+    with pytest.raises(TypeError):
+        Blind(3)
+
+
+@pytest.mark.parametrize('name', [n for n, c in OPTIMIZERS.items() if c.full_batch])
+def test_line_search_minimizes_quadratic(name):
+    scale = np.array([1.0, 10.0, 100.0])
+    params = np.array([1.0, 1.0, 1.0])
+    opt = create(name, 3)
+
+    def fun():
+        return 0.5 * float(np.dot(scale * params, params)), scale * params
+
+    updated = True
+    for _ in range(50):
+        if not updated:
+            break
+        updated, _ = opt.iterate(fun, params, 1.0)
+    assert np.max(np.abs(params)) < 1e-6
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Tests for running mode helpers.
+"""
+
+import numpy as np
+import pytest
+
+from neuro.parser import holdout
+
+
+def _data(n):
+    return np.arange(2 * n, dtype=float).reshape(n, 2), np.ones((n, 1))
+
+
+def test_holdout_split():
+    train, validation = holdout(_data(10), '0.2')
+    assert len(train[0]) == len(train[1]) == 8
+    assert len(validation[0]) == len(validation[1]) == 2
+    # Every instance ends up in exactly one partition
+    rows = np.concatenate([train[0], validation[0]])
+    assert sorted(rows[:, 0].tolist()) == list(range(0, 20, 2))
+
+
+@pytest.mark.parametrize('ratio', ['0', '-0.5', '1', '1.5', '0.05', '2'])
+def test_holdout_rejects_empty_partitions(ratio):
+    with pytest.raises(ValueError):
+        holdout(_data(10), ratio)
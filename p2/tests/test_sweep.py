@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Tests for the hyperparameter sweep program.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+from neuro.dataset import Dataset
+from neuro.sweep import grid, halving
+
+# Program directory (sweep.py is run from there, as in the Makefile)
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_sweep_mode3(tmp_path):
+    output = tmp_path / 'sweep.tsv'
+    done = subprocess.run(
+        [sys.executable, 'sweep.py', '-s', '2', '-i', '1', '-l', '0.5', '-e', '2',
+         '-j', '1', '-o', str(output), 'mode3', '-d', 'data/xor.txt', '-t', 'data/and.txt'],
+        cwd=ROOT, capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    rows = output.read_text().splitlines()
+    assert len(rows) == 2
+    assert 'Test Score:' in done.stdout
+
+
+def test_halving_trains_winner_for_every_epoch():
+    ds = Dataset(str(ROOT / 'data' / 'xor.txt'))
+    data = ds.data()
+    configs = grid([[2]], [0.5, 1.0], [0.1, 0.5], [9], [False])
+    results = halving(configs, ds.sizein, ds.sizeout, data, data, data, 9, 1, eta=2, jobs=1)
+    # Same ranking as the sweep program
+    best = min(results, key=lambda r: (-r['epochs'], r['valid']))
+    assert best['epochs'] == 9
+    assert len(best['mse']) == 9
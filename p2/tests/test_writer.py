@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Tests for the prediction and dataset file writer.
+"""
+
+import numpy as np
+
+from neuro.writer import Writer
+
+
+def _rows():
+    X = np.linspace(-1, 1, 30).reshape(10, 3)
+    T = -np.ones((10, 2), dtype=int)
+    T[:, 0] = 1
+    return X, T
+
+
+def test_raw_has_no_header(tmp_path):
+    X, T = _rows()
+    path = str(tmp_path / 'preds.raw')
+    with Writer(path, header='3 2') as w:
+        w.write(X[:4], T[:4])
+        w.write(X[4:], T[4:])
+    data = np.fromfile(path).reshape(-1, 5)
+    assert np.array_equal(data, np.hstack([X, T]))
+
+
+def test_npy_round_trip(tmp_path):
+    X, T = _rows()
+    path = str(tmp_path / 'preds.npy')
+    with Writer(path, header='3 2') as w:
+        w.write(X, T)
+    assert np.array_equal(np.load(path), np.hstack([X, T]))
+
+
+def test_text_keeps_header(tmp_path):
+    X, T = _rows()
+    path = str(tmp_path / 'preds.txt')
+    with Writer(path, header='3 2') as w:
+        w.write(X, T)
+    lines = open(path).read().splitlines()
+    assert lines[0] == '3 2'
+    assert np.array_equal(np.loadtxt(lines[1:]), np.hstack([X, T]))
@@ -1,6 +1,8 @@
 import numpy as np
 from copy import deepcopy
 
+from neuro.writer import Writer
+
 class Alphabet:
 
     filename=None
@@ -33,15 +35,13 @@ class Alphabet:
         data = np.tile(self._data[:subset], (n, 1))
         clean_data = deepcopy(data)
 
-        with open(filename,'w') as file:
-
-            file.write('{} {}'.format(self._resolution, self._resolution) + '\n')
+        for i in range(data.shape[0]):
+            r = np.random.choice(range(self._resolution),size=errors)
+            data[i][r] = 1 - data[i][r]
 
-            for i in range(data.shape[0]):
-                r = np.random.choice(range(self._resolution),size=errors)
-                data[i][r] = 1 - data[i][r]
+        with Writer(filename, header='{} {}'.format(self._resolution, self._resolution)) as file:
 
-                file.write(' '.join(data[i].astype(str)) +' '+' '.join(clean_data[i%clean_data.shape[0]].astype(str)) + '\n')
+            file.write(data, clean_data)
 
 
         return data
\ No newline at end of file
@@ -3,6 +3,8 @@
 """Autoencoder implementation.
 """
 
+import numpy as np
+
 from neuro.ml_perceptron import MLPerceptron, BIAS_KEY
 
 
@@ -16,23 +18,20 @@ class Autoencoder(MLPerceptron):
         hsizes (list): Hidden layers sizes.
     """
 
-    def __init__(self, name, sizein, sizeout, hsizes):
-        super().__init__(name, sizein, sizeout, hsizes)
+    def __init__(self, name, sizein, sizeout, hsizes, activation='bipolar'):
+        super().__init__(name, sizein, sizeout, hsizes, activation=activation)
 
-    def test(self, data):
-        """Run the net for an ordered list of instances.
+    def _test(self, a):
+        """Run the net for input layer values.
 
         Args:
-            data (list): Ordered list of input instances.
-
-        Raises:
-            ValueError: If `data` is invalid.
+            a (numpy.ndarray): Input layer values (already normalized).
 
         Returns:
-            list: Ordered list of output instances.
+            numpy.ndarray: Matrix of bipolar output instances (one per row).
         """
 
-        return [list(map(lambda x: 2 * int(x > 0) - 1, d)) for d in super().test(data)]
+        return np.where(super()._test(a) > 0, 1, -1)
 
     def stats(self, datain, dataout):
         """Gather statistics about test data classification.
@@ -54,23 +53,10 @@ class Autoencoder(MLPerceptron):
 
         # Run test for input data
         results = self.test(datain)
-        # Initialize metrics
-        wo = 0
-
-        ci = 0
-
-        # For every instance
-        for T, Y in zip(dataout, results):
-            e = sum([t != y for t, y in zip(T, Y)])
-            #print(10 * '*')
-            #print('Diff: ', [int(t != y) for t, y in zip(T, Y)])
-            #print(10 * '*')
-
-            # Check if the output is correct
-            if e == 0:
-                ci += 1
-            # Otherwise, gather errors
-            else:
-                wo += e
+        # Count wrong outputs for every instance
+        e = np.count_nonzero(np.asarray(dataout) != results, axis=1)
+        # Gather errors and correct instances
+        wo = int(e.sum())
+        ci = int(np.count_nonzero(e == 0))
 
         return wo, wo / len(datain), ci
@@ -0,0 +1,94 @@
+# !/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Binary cache for dataset files.
+
+Parsed instances are saved as `.npy` files in a `CACHE_DIR` directory next to
+the dataset file, named after it and a hash of its contents, so that editing
+the dataset file makes the old cache stale. Later loads memory map the cache
+instead of parsing the text again.
+"""
+
+import os
+from glob import escape, glob
+from hashlib import blake2b
+
+import numpy as np
+
+# Cache directory name (created next to dataset files)
+CACHE_DIR = '.neurocache'
+
+
+def _path(filename, content, cache):
+    """Get the cache file for given dataset contents.
+
+    Args:
+        filename (str): Dataset file.
+        content (bytes): Dataset file contents.
+        cache (str): Cache directory (None for `CACHE_DIR` next to the dataset file).
+
+    Returns:
+        str: Cache file.
+    """
+
+    if cache is None:
+        cache = os.path.join(os.path.dirname(filename), CACHE_DIR)
+    digest = blake2b(content, digest_size=16).hexdigest()
+    return os.path.join(cache, '{}.{}.npy'.format(os.path.basename(filename), digest))
+
+
+def _save(path, data):
+    """Save a cache file, replacing stale ones for the same dataset file.
+
+    Caching is skipped if the cache directory cannot be written.
+
+    Args:
+        path (str): Cache file.
+        data (numpy.ndarray): Parsed instances.
+    """
+
+    # Stale caches share the name of the dataset file
+    stale = glob('{}.{}.npy'.format(escape(path.rsplit('.', 2)[0]), '?' * 32))
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a new file and move it into place
+        tmp = '{}.tmp.npy'.format(path)
+        np.save(tmp, data)
+        os.replace(tmp, path)
+        for s in stale:
+            if s != path:
+                os.remove(s)
+    except OSError:
+        pass
+
+
+def read(filename, cache=None):
+    """Read a dataset file, through its binary cache.
+
+    Values are returned as they are in the file (no transformation is applied).
+
+    Args:
+        filename (str): Dataset file.
+        cache (str, optional): Defaults to None. Cache directory (None for
+            `CACHE_DIR` next to the dataset file, '' to disable caching).
+
+    Returns:
+        tuple: (sizein, sizeout, data), where data has one instance per row,
+            input values first.
+    """
+
+    # Read raw contents (hashing them is much cheaper than parsing)
+    with open(filename, 'rb') as file:
+        content = file.read()
+    # Load data size
+    head, _, body = content.partition(b'\n')
+    sizein, sizeout = (int(x) for x in head.split())
+    # Memory map cached instances if available
+    path = _path(filename, content, cache) if cache != '' else None
+    if path is not None and os.path.exists(path):
+        return sizein, sizeout, np.load(path, mmap_mode='r')
+    # Parse instances
+    data = np.array(body.split(), dtype=float).reshape(-1, sizein + sizeout)
+    # Save cache for later loads
+    if path is not None:
+        _save(path, data)
+    return sizein, sizeout, data
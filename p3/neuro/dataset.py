@@ -3,9 +3,14 @@
 """Dataset management.
 """
 
+from itertools import islice
 from math import floor
 from random import shuffle
 
+import numpy as np
+
+from neuro.cache import read
+
 
 class Dataset:
     """Dataset class.
@@ -23,36 +28,32 @@ class Dataset:
     _datain = None
     _dataout = None
 
-    def __init__(self, filename, pol=False):
+    def __init__(self, filename, pol=False, cache=None):
         """Constructor.
 
         Args:
             filename (str): Dataset file.
             pol (bool, optional): Defaults to False. Whether data is in polar form.
+            cache (str, optional): Defaults to None. Cache directory for parsed
+                data (None for the default one, '' to disable caching).
         """
 
-        # Open dataset file
-        with open(filename, 'r') as file:
-            # Load data size
-            [_sizein, _sizeout] = file.readline().split()
-            self.sizein = int(_sizein)
-            self.sizeout = int(_sizeout)
-            # Load instances
-            if pol:
-                data = [[float(x) for x in l.split()]
-                        for l in file.read().splitlines()]
-            else:
-                data = [[2*float(x)-1 for x in l.split()]
-                        for l in file.read().splitlines()]
-            # Save instance count
-            self.count = len(data)
-            # Split data
-            self._datain = [d[:self.sizein] for d in data]
-            self._dataout = [d[self.sizein:] for d in data]
+        # Load data size and instances (through the binary cache)
+        self.sizein, self.sizeout, data = read(filename, cache=cache)
+        # Convert to polar form
+        if not pol:
+            data = 2 * data - 1
+        # Save instance count
+        self.count = len(data)
+        # Split data into contiguous matrices
+        self._datain = np.ascontiguousarray(data[:, :self.sizein])
+        self._dataout = np.ascontiguousarray(data[:, self.sizein:])
 
     def data(self):
         """Return a tuple with input and output data.
 
+        Data is not copied, so every call returns the same matrices.
+
         Returns:
             tuple: (input data, output data)
         """
@@ -64,7 +65,8 @@ class Dataset:
 
         Args:
             ratio (float): Ratio for train.
-            shuff (bool, optional): Defaults to True. Shuffle data.
+            shuff (bool, optional): Defaults to True. Shuffle data (otherwise
+                partitions are views over the data, not copies).
 
         Raises:
             ValueError: If `ratio` is invalid.
@@ -78,18 +80,126 @@ class Dataset:
         # Check that split index is valid
         if not 0 < split < self.count:
             raise ValueError("Invalid ratio. Empty train or test set.")
+        # Keep order (partitions are views over the data)
+        if not shuff:
+            return ((self._datain[:split], self._dataout[:split]),
+                    (self._datain[split:], self._dataout[split:]))
+        # Create shuffled list of indices
+        indices = list(range(self.count))
+        shuffle(indices)
+        # Create partitions
+        train = self.take(indices[:split])
+        test = self.take(indices[split:])
+        # Return partitions
+        return train, test
+
+    def take(self, indices):
+        """Return a tuple with input and output data for given instances.
+
+        Args:
+            indices (list): Ordered list of instance indices.
+
+        Returns:
+            tuple: (input data, output data)
+        """
+
+        return self._datain[indices], self._dataout[indices]
+
+    def folds(self, k, stratified=False, shuff=True):
+        """Split instances into folds for cross-validation.
+
+        Args:
+            k (int): Number of folds.
+            stratified (bool, optional): Defaults to False. Keep class ratios in every fold.
+            shuff (bool, optional): Defaults to True. Shuffle data.
+
+        Raises:
+            ValueError: If `k` is invalid.
+
+        Returns:
+            list: Lists of instance indices, one per fold.
+        """
+
+        # Check that every fold gets instances
+        if not 1 < k <= self.count:
+            raise ValueError("Invalid number of folds.")
         # Create list of indices
         indices = list(range(self.count))
         # Shuffle list of indices
         if shuff:
             shuffle(indices)
-        # Create train partition
-        train = list()
-        train.append(list(map(self._datain.__getitem__, indices[:split])))
-        train.append(list(map(self._dataout.__getitem__, indices[:split])))
-        # Create test partition
-        test = list()
-        test.append(list(map(self._datain.__getitem__, indices[split:])))
-        test.append(list(map(self._dataout.__getitem__, indices[split:])))
-        # Return partitions
-        return train, test
+        # Group instances by class (stable, so shuffle is kept within classes)
+        if stratified:
+            indices.sort(key=np.argmax(self._dataout, axis=1).__getitem__)
+        # Deal instances to folds
+        return [indices[i::k] for i in range(k)]
+
+
+class DatasetStream:
+    """Dataset read from its file in chunks, every time it is iterated.
+
+    Only a chunk of instances is held in memory at a time, so files larger
+    than the available memory can be used for training (see `MLPerceptron.train`).
+
+    Attributes:
+        sizein (int): Input layer size.
+        sizeout (int): Output layer size.
+        chunk_size (int): Number of instances per chunk.
+    """
+
+    sizein = None
+    sizeout = None
+    chunk_size = None
+
+    _filename = None
+    _pol = None
+
+    def __init__(self, filename, chunk_size=4096, pol=False):
+        """Constructor.
+
+        Args:
+            filename (str): Dataset file.
+            chunk_size (int, optional): Defaults to 4096. Number of instances per chunk.
+            pol (bool, optional): Defaults to False. Whether data is in polar form.
+
+        Raises:
+            ValueError: If `chunk_size` is invalid.
+        """
+
+        # Check chunk size
+        if chunk_size < 1:
+            raise ValueError('Chunk size must be a positive integer.')
+        self.chunk_size = chunk_size
+        self._filename = filename
+        self._pol = pol
+        # Load data size
+        with open(filename, 'rb') as file:
+            [_sizein, _sizeout] = file.readline().split()
+        self.sizein = int(_sizein)
+        self.sizeout = int(_sizeout)
+
+    def __iter__(self):
+        """Read the dataset file chunk by chunk.
+
+        Raises:
+            ValueError: If an instance does not match the data size.
+
+        Yields:
+            tuple: (input data, output data) matrices for a chunk of instances.
+        """
+
+        with open(self._filename, 'rb') as file:
+            # Skip data size
+            file.readline()
+            while True:
+                # Read next lines (skipping empty ones)
+                lines = [l for l in islice(file, self.chunk_size) if not l.isspace()]
+                if not lines:
+                    return
+                # Parse chunk at once
+                data = np.array(b' '.join(lines).split(), dtype=float).reshape(
+                    -1, self.sizein + self.sizeout)
+                # Convert to polar form
+                if not self._pol:
+                    data = 2 * data - 1
+                yield data[:, :self.sizein], data[:, self.sizein:]
@@ -4,8 +4,11 @@
 """
 
 from argparse import ArgumentParser, RawTextHelpFormatter
+from math import floor
+from random import shuffle
 
-from neuro.dataset import Dataset
+from neuro.base.optimizer import OPTIMIZERS
+from neuro.dataset import Dataset, DatasetStream
 
 
 class Parser():
@@ -43,15 +46,45 @@ class Parser():
         self._parser = ArgumentParser(description=desc,
                                       formatter_class=RawTextHelpFormatter)
         self._parser.add_argument(
-            '-s', '--sizes', help='list of sizes for hidden layers', required=True, nargs='+')
+            '-s', '--sizes', help='list of sizes for hidden layers', nargs='+')
         self._parser.add_argument(
-            '-i', '--init', help='weight initialization boundary (e.g. \'1\' => [-1, 1])', required=True)
+            '-i', '--init', help='weight initialization boundary (e.g. \'1\' => [-1, 1])')
         self._parser.add_argument(
-            '-l', '--learn', help='learning rate', required=True)
+            '-l', '--learn', help='learning rate')
         self._parser.add_argument(
-            '-e', '--epochs', help='maximum number of training epochs', required=True)
+            '-e', '--epochs', help='maximum number of training epochs')
         self._parser.add_argument(
             '-z', '--normalize', help='normalize data', action='store_true')
+        self._parser.add_argument(
+            '-O', '--optimizer', help='weight update rule (default: sgd; lbfgs and cg train full-batch)', choices=list(OPTIMIZERS), default='sgd')
+        self._parser.add_argument(
+            '-b', '--batch', help='mini-batch size (default: 1 => online training)', default='1')
+        self._parser.add_argument(
+            '-j', '--jobs', help='worker processes (training: default 1, modeK: one per CPU)', default=None)
+        self._parser.add_argument(
+            '-L', '--load', help='load a saved model instead of training (-s, -i, -l and -e are then not required)', default=None)
+        self._parser.add_argument(
+            '-S', '--save', help='save the model to a file', default=None)
+        self._parser.add_argument(
+            '-C', '--checkpoint', help='save training checkpoints to a file', default=None)
+        self._parser.add_argument(
+            '-N', '--checkpoint_every', help='epochs between checkpoints (default: 10)', default='10')
+        self._parser.add_argument(
+            '-R', '--resume', help='resume training from the checkpoint file, if it exists', action='store_true')
+        self._parser.add_argument(
+            '-E', '--error', help='MSE tracking: \'exact\' (extra pass over the data) or \'online\' (errors of the updates) (default: exact)', choices=['exact', 'online'], default='exact')
+        self._parser.add_argument(
+            '-K', '--error_every', help='epochs between exact MSE values (default: 1)', default='1')
+        self._parser.add_argument(
+            '-U', '--error_sample', help='instances in a fixed random subsample for exact MSE values (default: all)', default=None)
+        self._parser.add_argument(
+            '-V', '--validation', help='ratio of training data held out for early stopping (e.g. \'0.2\' => 20%%)', default=None)
+        self._parser.add_argument(
+            '-T', '--tol', help='minimum MSE decrease that counts as an improvement', default=None)
+        self._parser.add_argument(
+            '-P', '--patience', help='epochs without improvement before stopping', default=None)
+        self._parser.add_argument(
+            '-W', '--max_time', help='maximum training seconds', default=None)
 
         # Create subparsers
         sp = self._parser.add_subparsers(dest='mode', help='Working mode')
@@ -77,7 +110,20 @@ class Parser():
         parser.add_argument(
             '-t', '--test', help='Test dataset file', required=True)
         parser.add_argument(
-            '-o', '--output', help='Output file for predictions', required=True)
+            '-o', '--output', help='Output file for predictions (\'.npy\' or \'.raw\' for binary)', required=True)
+        parser.add_argument(
+            '-p', '--precision', help='significant digits of predicted values (default: exact)', default=None)
+        parser.add_argument(
+            '-c', '--chunk', help='test instances per prediction chunk (default: 4096)', default='4096')
+
+        # Cross-validation subparser
+        parser = sp.add_parser(
+            'modeK', help='1 file. K-fold cross-validation.')
+        parser.add_argument('-d', '--data', help='Dataset file', required=True)
+        parser.add_argument(
+            '-k', '--folds', help='Number of folds', required=True)
+        parser.add_argument(
+            '-c', '--stratified', help='keep class ratios in every fold', action='store_true')
 
         # Recursive subparser
         parser = sp.add_parser(
@@ -91,9 +137,28 @@ class Parser():
         parser.add_argument(
             '-o', '--output', help='Output file for predictions', required=True)
 
-        self.parse_args = self._parser.parse_args
+    def parse_args(self, args=None):
+        """Parse command line arguments.
+
+        Args:
+            args (list, optional): Defaults to None. Arguments (None for `sys.argv`).
 
-    parse_args = None
+        Returns:
+            argparse.Namespace: Parsed arguments.
+        """
+
+        ns = self._parser.parse_args(args)
+        # Check that training settings are given unless a model is loaded
+        if ns.load is None:
+            missing = [f for f, v in (('-s', ns.sizes), ('-i', ns.init),
+                                      ('-l', ns.learn), ('-e', ns.epochs)) if v is None]
+            if missing:
+                self._parser.error('the following arguments are required: {}'.format(
+                    ', '.join(missing)))
+        # Cross-validation trains its own nets
+        elif ns.mode == 'modeK':
+            self._parser.error('a saved model cannot be cross-validated')
+        return ns
 
 
 def mode1(data_file, ratio, shuff=True):
@@ -139,29 +204,84 @@ def mode2(data_file):
     return ds.sizein, ds.sizeout, train, test
 
 
-def mode3(train_file, test_file):
+def mode3(train_file, test_file, chunk_size=4096):
     """Prepares data for mode 3.
 
+    Test instances are not loaded, but read in chunks as they are predicted.
+
     Args:
         train_file (str): Train dataset file.
         test_file (str): Test dataset file.
+        chunk_size (int, optional): Defaults to 4096. Test instances per chunk.
 
     Returns:
-        tuple: (sizein, sizeout, train, test)
+        tuple: (sizein, sizeout, train, test), where test is a `DatasetStream`.
     """
     print('Running in Mode 3')
     # Load train dataset
     ds1 = Dataset(train_file)
     train = ds1.data()
-    # Load test dataset
-    ds2 = Dataset(test_file)
-    test = ds2.data()
+    # Open test dataset for streaming
+    test = DatasetStream(test_file, chunk_size=int(chunk_size))
 
     print('- Train instances: {}'.format(len(train[0])))
-    print('- Test instances: {}'.format(len(test[0])))
+    print('- Test instances: read in chunks of {}'.format(test.chunk_size))
 
     return ds1.sizein, ds1.sizeout, train, test
 
+def modeK(data_file, k, stratified=False):
+    """Prepares data for cross-validation mode.
+
+    Args:
+        data_file (str): Dataset file.
+        k (int): Number of folds.
+        stratified (bool, optional): Defaults to False. Keep class ratios in every fold.
+
+    Returns:
+        tuple: (sizein, sizeout, dataset, folds)
+    """
+
+    print('Running in Cross-validation Mode')
+    # Load the dataset
+    ds = Dataset(data_file)
+    # Build fold indices once
+    folds = ds.folds(int(k), stratified=stratified)
+    print('- Instances: {}'.format(ds.count))
+    print('- Folds: {}'.format(len(folds)))
+
+    return ds.sizein, ds.sizeout, ds, folds
+
+
+def holdout(train, ratio):
+    """Holds out part of the training data for validation.
+
+    Args:
+        train (tuple): (input data, output data)
+        ratio (float): Ratio of instances held out (e.g. '0.2' => 20%).
+
+    Raises:
+        ValueError: If `ratio` is invalid.
+
+    Returns:
+        tuple: (train, validation)
+    """
+    count = len(train[0])
+    # Get index for split
+    k = floor(float(ratio) * count)
+    # Check that split index is valid
+    if not 0 < k < count:
+        raise ValueError('Invalid validation ratio. Empty train or validation set.')
+    # Shuffle instances and split them
+    indices = list(range(count))
+    shuffle(indices)
+    validation = tuple(d[indices[:k]] for d in train)
+    train = tuple(d[indices[k:]] for d in train)
+
+    print('- Validation instances: {} (held out from train)'.format(len(validation[0])))
+
+    return train, validation
+
+
 def modeR(train_file, proportion):
     """Prepares data for recursive mode.
 
@@ -0,0 +1,48 @@
+# !/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Streaming predictions.
+
+Test instances are read from their file in chunks (see `DatasetStream`), run
+through the net a chunk at a time and written out as they are predicted (see
+`Writer`), so memory use does not depend on the size of the test file.
+"""
+
+import numpy as np
+
+
+def predict(net, stream):
+    """Run a net over a dataset stream.
+
+    Args:
+        net (MLPerceptron): Net to run.
+        stream (DatasetStream): Test instances.
+
+    Raises:
+        ValueError: If the stream does not match the net sizes.
+
+    Yields:
+        tuple: (input data, expected output data, output data) matrices for
+            a chunk of instances.
+    """
+
+    # Check that data sizes match
+    if stream.sizein != net.sizein:
+        raise ValueError('Input instance size mismatch ({}).'.format(net.sizein))
+    for X, T in stream:
+        yield X, T, net.test(X)
+
+
+def bipolar(results):
+    """Encode predicted classes in bipolar form.
+
+    Args:
+        results (numpy.ndarray): Matrix of output instances (one per row).
+
+    Returns:
+        numpy.ndarray: Matrix with 1 for the predicted class of every instance, -1 elsewhere.
+    """
+
+    r = -np.ones(results.shape, dtype=int)
+    r[np.arange(len(results)), np.argmax(results, axis=1)] = 1
+    return r
+
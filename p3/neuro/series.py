@@ -3,9 +3,11 @@
 """Series implementation.
 """
 
-from copy import deepcopy
+import numpy as np
 
-from neuro.ml_perceptron import MLPerceptron, BIAS_KEY, NAME_I, NAME_O, NAME_H
+from neuro.ml_perceptron import MLPerceptron
+from neuro.base.optimizer import create as create_optimizer
+from neuro.base.stopping import EarlyStopping
 import queue
 from collections import deque
 
@@ -19,86 +21,67 @@ class Series(MLPerceptron):
         hsizes (list): Hidden layers sizes.
     """
 
-    def __init__(self, name, sizein, sizeout, hsizes):
-        super().__init__(name, sizein, sizeout, hsizes)
-
-    def _dfs(self, c, instance, hist=dict()):
-        """Internal implementation of Depth First Search for cell transfers.
-
-        Args:
-            c (str): Final cell name.
-            instance (list): Ordered list of values for input layer.
-            hist (dict, optional): Defaults to {}. Value history [in, out].
-
-        Raises:
-            ValueError: If `instance` is invalid.
-
-        Returns:
-            int: Final cell output value.
-        """
-
-        # Check that input sizes match
-        if len(instance) != len(self._x):
-            raise ValueError('Instance {} does not match input layer size ({}).'.format(
-                instance, len(self._x)))
-        # Create dict with input values from instance
-        x = {name: value for name, value in zip(self._x, instance)}
-        # Degenerate case
-        if not c:
-            return 0
-        # If input cell
-        if c in self._x:
-            # Get input value from instance
-            _x = x[c]
-            # If normalization enabled
-            if self._normalize:
-                # Get input cell index
-                i = self._x.index(c)
-                # Normalize value
-                _x = (_x - self._μ[i]) / self._σ[i]
-            # Add value to history (duplicated for data consistency)
-            hist[c] = [_x, _x]
-            # Return value
-            return _x
-        # Get bias
-        b = self._synapses[c][BIAS_KEY]
-        # Weighted sum of ingoing synapses
-        s = sum([w * self._dfs(d, instance, hist=hist)
-                 for d, w in self._synapses[c].items() if d is not BIAS_KEY])
-        # Add values to history
-        hist[c] = [b + s, b + s]
-        # Return output value
-        return b + s
+    def __init__(self, name, sizein, sizeout, hsizes, activation='identity-bipolar'):
+        # Linear cells by default (still trained with the bipolar sigmoid derivative)
+        super().__init__(name, sizein, sizeout, hsizes, activation=activation)
 
     """Adjust net weights from training data (recursively).
 
     Args:
         datain (list): Ordered list of input instances to train.
         dataout (list): Ordered list of expected output instances.
-        learn (float): Learning rate to use during training.
+        learn (float): Learning rate to use during training (its valid range
+            depends on `optimizer`).
         epochs (int): Maximum number of epochs to train.
         normalize (bool, optional): Defaults to False. Normalize data.
+        validation (tuple, optional): Defaults to None. Held-out (input data,
+            output data) whose MSE is monitored instead of the training one.
+        tol (float, optional): Defaults to None. Minimum decrease of the
+            monitored MSE that counts as an improvement.
+        patience (int, optional): Defaults to None. Stop after this many epochs without improvement.
+        max_time (float, optional): Defaults to None. Stop after this many seconds.
+            If any of `validation`, `tol`, `patience` or `max_time` is given,
+            the weights with the lowest monitored MSE are restored at the end.
+        optimizer (str, optional): Defaults to 'sgd'. Weight update rule (see `neuro.base.optimizer`).
 
     Returns:
         list: Output MSE value throughout the epochs.
 
     Raises:
-        ValueError: If `datain` or `dataout` are invalid.
+        ValueError: If `datain`, `dataout`, `validation`, `tol`, `patience`,
+            `max_time`, `optimizer` or `learn` are invalid.
     """
 
-    def train_recursive(self, datain, dataout, learn, epochs, normalize=False):
+    def train_recursive(self, datain, dataout, learn, epochs, normalize=False,
+                        validation=None, tol=None, patience=None, max_time=None,
+                        optimizer='sgd'):
         # Check that data sizes match
         if len(datain) != len(dataout):
             raise ValueError('Input and output instance counts do not match.')
-        # Check learning rate range
-        if not 0 < learn <= 1:
+        # Check learning rate range for the update rule
+        opt = create_optimizer(optimizer, len(self._synapses.params))
+        opt.check(learn)
+        if opt.full_batch:
+            raise ValueError('Recursive training does not support the {} optimizer.'.format(optimizer))
+        # Plain SGD updates are applied as corrections are computed
+        rule = None if optimizer == 'sgd' else opt
+        # Check that output sizes match
+        T = np.asarray(dataout, dtype=float)
+        if T.size and (T.ndim != 2 or T.shape[1] != len(self._y)):
             raise ValueError(
-                'Learning rate must be within the interval (0, 1].')
+                'Instance {} does not match output layer size ({}).'.format(dataout[0], len(self._y)))
+        # Check (and start) stopping criteria
+        stopper = EarlyStopping(tol=tol, patience=patience, max_time=max_time)
+        early = any(v is not None for v in (validation, tol, patience, max_time))
         # Print initial progress
         print('Training... 0%', end='\r')
         # Normalize input if required
         if normalize:
             self.normalize(datain)
+        # Get raw input matrix (recursion replaces its last value)
+        S = np.array(datain, dtype=float)
+        # Allocate buffers
+        ins, outs, grad = self._buffers()
         # Create list for MSE
         mse = list()
         # Initialize stop condition to false
@@ -112,73 +95,41 @@ class Series(MLPerceptron):
             # Assume stop condition
             stop = True
             # For each training pair in data
-            for s, t in zip(datain, dataout):
-                # Check that output sizes match
-                if len(self._y) != len(t):
-                    raise ValueError(
-                        'Instance {} does not match output layer size ({}).'.format(t, len(self._y)))
-                # Create dict for new synapses
-                synapses = deepcopy(self._synapses)
-                # Create history dict
-                hist = dict()
-                # Populate history dict and get output values
+            for s, t in zip(S, T):
+                # Recursive case
                 if previous is not None:
-                    # Recursive case
-                    y = self.test_instance(s[:-1] + [previous], hist=hist)
-                else:
-                    # Basic case
-                    y = self.test_instance(s, hist=hist)
+                    s = s.copy()
+                    s[-1] = previous
+                # Run backpropagation step
+                e = self._step(self._input([s])[0], t, learn, ins, outs, grad, rule)
                 # Save value for next recursion
-                previous = y[0]
-                # Initialize list of input deltas
-                δ_in = [t[j] - y[j] for j in range(len(y))]
-                # Create lists for retropropagation
-                names = [NAME_O] + self._hnames[::-1] + [NAME_I]
-                sizes = [self.sizeout] + self.hsizes[::-1] + [self.sizein]
-                # Retropropagation
-                for k in range(len(names) - 1):
-                    # Initialize list for previous layer δ_in
-                    _δ_in = [0] * sizes[k + 1]
-                    # For each cell in current layer
-                    for j in range(sizes[k]):
-                        # If correction is needed
-                        if δ_in[j] != 0:
-                            _zz = '{}{}'.format(names[k], j)
-                            # Get input value from history
-                            zz_in = hist[_zz][0]
-                            # Compute current delta
-                            δ = δ_in[j] * self.df(zz_in)
-                            # Save bias weight correction
-                            synapses[_zz][BIAS_KEY] += learn * δ
-                            # For each cell in previous layer
-                            for i in range(sizes[k + 1]):
-                                _z = '{}{}'.format(names[k + 1], i)
-                                # Get output value from history
-                                z = hist[_z][1]
-                                # Save synaptic weight correction
-                                synapses[_zz][_z] += learn * δ * z
-                                # Accumulate δ_in
-                                _δ_in[i] += δ * self._synapses[_zz][_z]
-                            # Clear stop condition
-                            stop = False
-                    # Set input deltas for previous layer
-                    δ_in = _δ_in
-                # Update synapses
-                self._synapses = synapses
+                previous = outs[-1][0]
+                # Clear stop condition if correction was needed
+                if stop and e.any():
+                    stop = False
             # Test dataset at the end of current epoch
             Y = self.test(datain)
-            # Compute residual sum of squares
-            rss = sum([sum([(dataout[i][j] - Y[i][j]) **
-                            2 for j in range(len(Y[i]))]) / len(Y[0]) for i in range(len(Y))])
             # Append MSE value after current epoch
-            mse.append(rss / len(Y))
+            mse.append(float(np.mean((T - Y) ** 2)))
             # Move to next epoch
             epoch += 1
+            # Check stopping criteria on validation or training MSE
+            if early:
+                e = mse[-1]
+                if validation is not None:
+                    Y = self.test(validation[0])
+                    e = float(np.mean((np.asarray(validation[1]) - Y) ** 2))
+                stop = stopper.update(epoch, e, self._synapses.params) or stop
             # Print current progress
             print('Training... {}%'.format(
                 int(100 * epoch / epochs)), end='\r', flush=True)
         # Print end of line
         print()
+        # Restore best weights
+        if early and stopper.restore(self._synapses.params):
+            if stopper.reason is not None:
+                print('Stopped at epoch {}: {}.'.format(epoch, stopper.reason))
+            print('Best epoch: {} (MSE {}).'.format(stopper.best_epoch, stopper.best))
         # Return MSE list
         return mse
 
@@ -201,18 +152,14 @@ class Series(MLPerceptron):
             raise ValueError('Input and output instance counts do not match.')
         # Run test for input data
         results = self.test(datain)
-        # Get number of instances
-        n = len(results)
-        # Initialize ECM metrics
-        ecm = 0
-        basic = 0
-        # For every instance
-        for X, T, Y in zip(datain, dataout, results):
-            # Accumulate ECM metrics
-            ecm += sum([(t - y) ** 2 for t, y in zip(T, Y)])
-            basic += sum([(t - X[-1]) ** 2 for t in T])
+        # Get expected output and last input value
+        T = np.asarray(dataout)
+        X = np.asarray(datain)[:, -1:]
+        # Compute ECM metrics
+        ecm = np.sum((T - results) ** 2) / len(results)
+        basic = np.sum((T - X) ** 2) / len(results)
         # Return both stats
-        return ecm/n, basic/n
+        return ecm, basic
 
     def predict_recursive(self, datain, n_epochs):
 
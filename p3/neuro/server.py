@@ -0,0 +1,271 @@
+# !/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Local inference server.
+
+Requests from concurrent clients are gathered into micro-batches, which run
+through a single vectorized forward pass of the net.
+
+The server speaks JSON over HTTP:
+
+    POST /predict  {"instances": [[...], ...]}  ->  {"outputs": [[...], ...]}
+    GET /stats                                  ->  latency and throughput counters
+"""
+
+import json
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Empty, Queue
+from threading import Lock, Thread
+from time import perf_counter
+
+import numpy as np
+
+# Request latencies kept for percentiles
+LATENCY_WINDOW = 10000
+
+
+class Batcher:
+    """Micro-batching front end for a trained net.
+
+    Every request is queued, and a single thread runs the queued requests as
+    one batch as soon as `max_batch` instances are waiting or the first of
+    them has waited `max_delay` seconds.
+
+    Attributes:
+        net (MLPerceptron): Net to run.
+        max_batch (int): Maximum number of instances per batch.
+        max_delay (float): Maximum seconds a request waits for others to join its batch.
+    """
+
+    net = None
+    max_batch = None
+    max_delay = None
+
+    _queue = None
+    _thread = None
+    _lock = None
+    _latencies = None
+    _requests = None
+    _instances = None
+    _batches = None
+    _start = None
+
+    def __init__(self, net, max_batch=64, max_delay=0.005):
+        """Constructor.
+
+        Args:
+            net (MLPerceptron): Net to run.
+            max_batch (int, optional): Defaults to 64. Maximum number of instances per batch.
+            max_delay (float, optional): Defaults to 0.005. Maximum seconds a
+                request waits for others to join its batch.
+
+        Raises:
+            ValueError: If `max_batch` or `max_delay` are invalid.
+        """
+
+        if max_batch < 1:
+            raise ValueError('Maximum batch size must be a positive integer.')
+        if max_delay < 0:
+            raise ValueError('Maximum delay cannot be negative.')
+        self.net = net
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = Queue()
+        self._lock = Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._requests = 0
+        self._instances = 0
+        self._batches = 0
+        self._start = perf_counter()
+        # Start batching thread
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, instances):
+        """Queue a request.
+
+        Args:
+            instances (list): Ordered list (or matrix) of input instances.
+
+        Raises:
+            ValueError: If `instances` are invalid.
+
+        Returns:
+            concurrent.futures.Future: Future for the matrix of output instances.
+        """
+
+        a = np.asarray(instances, dtype=float)
+        # Check that input sizes match
+        if a.ndim != 2 or a.shape[1] != self.net.sizein or not len(a):
+            raise ValueError('Instances do not match input layer size ({}).'.format(
+                self.net.sizein))
+        future = Future()
+        self._queue.put((a, future, perf_counter()))
+        return future
+
+    def predict(self, instances):
+        """Run a request and wait for its outputs.
+
+        Args:
+            instances (list): Ordered list (or matrix) of input instances.
+
+        Raises:
+            ValueError: If `instances` are invalid.
+
+        Returns:
+            numpy.ndarray: Matrix of output instances (one per row).
+        """
+
+        return self.submit(instances).result()
+
+    def _collect(self):
+        """Wait for a batch of requests.
+
+        Returns:
+            list: Queued requests (None stands for the stop signal).
+        """
+
+        batch = [self._queue.get()]
+        if batch[0] is None:
+            return batch
+        n = len(batch[0][0])
+        deadline = batch[0][2] + self.max_delay
+        # Add requests until batch is full or the first one is due
+        while n < self.max_batch:
+            timeout = deadline - perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except Empty:
+                break
+            batch.append(item)
+            if item is None:
+                break
+            n += len(item[0])
+        return batch
+
+    def _run(self):
+        """Batching thread loop.
+        """
+
+        stop = False
+        while not stop:
+            batch = self._collect()
+            # Stop signal ends the loop after current batch
+            if batch[-1] is None:
+                stop = True
+                batch.pop()
+            if not batch:
+                continue
+            # Run the whole batch at once
+            X = np.concatenate([a for a, _, _ in batch])
+            try:
+                Y = self.net.test(X)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            # Hand every request its own outputs
+            t = perf_counter()
+            i = 0
+            for a, future, t0 in batch:
+                future.set_result(Y[i:i + len(a)])
+                i += len(a)
+                self._latencies.append(t - t0)
+            with self._lock:
+                self._requests += len(batch)
+                self._instances += i
+                self._batches += 1
+
+    def stats(self):
+        """Get latency and throughput counters.
+
+        Returns:
+            dict: Requests, instances and batches served, mean batch size,
+                instances per second since start and p50/p99 request latency
+                in milliseconds (over the last `LATENCY_WINDOW` requests).
+        """
+
+        with self._lock:
+            requests, instances, batches = self._requests, self._instances, self._batches
+            latencies = np.array(self._latencies)
+        p50, p99 = (np.percentile(latencies, [50, 99]) * 1000).tolist() if len(latencies) else (0.0, 0.0)
+        return dict(requests=requests, instances=instances, batches=batches,
+                    batch_size=instances / batches if batches else 0.0,
+                    throughput=instances / (perf_counter() - self._start),
+                    p50_ms=p50, p99_ms=p99)
+
+    def close(self):
+        """Serve queued requests and stop the batching thread.
+        """
+
+        self._queue.put(None)
+        self._thread.join()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP request handler (the server holds the batcher).
+    """
+
+    def _reply(self, code, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._reply(200, self.server.batcher.stats())
+        else:
+            self._reply(404, dict(error='Not found.'))
+
+    def do_POST(self):
+        if self.path != '/predict':
+            self._reply(404, dict(error='Not found.'))
+            return
+        try:
+            size = int(self.headers.get('Content-Length', 0))
+            instances = json.loads(self.rfile.read(size).decode('utf-8'))['instances']
+            future = self.server.batcher.submit(instances)
+        except (ValueError, KeyError, TypeError) as e:
+            self._reply(400, dict(error=str(e)))
+            return
+        self._reply(200, dict(outputs=future.result().tolist()))
+
+    def log_message(self, format, *args):
+        # Keep quiet on every request
+        pass
+
+
+class InferenceServer(ThreadingHTTPServer):
+    """HTTP server answering predictions through a `Batcher`.
+
+    Attributes:
+        batcher (Batcher): Micro-batching front end of the net.
+    """
+
+    daemon_threads = True
+    batcher = None
+
+    def __init__(self, net, host='127.0.0.1', port=8000, max_batch=64, max_delay=0.005):
+        """Constructor.
+
+        Args:
+            net (MLPerceptron): Net to serve.
+            host (str, optional): Defaults to '127.0.0.1'. Address to listen on.
+            port (int, optional): Defaults to 8000. Port to listen on (0 for any free one).
+            max_batch (int, optional): Defaults to 64. Maximum number of instances per batch.
+            max_delay (float, optional): Defaults to 0.005. Maximum seconds a
+                request waits for others to join its batch.
+        """
+
+        self.batcher = Batcher(net, max_batch=max_batch, max_delay=max_delay)
+        super().__init__((host, port), _Handler)
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
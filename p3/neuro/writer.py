@@ -0,0 +1,165 @@
+# !/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Fast writer for prediction and dataset files.
+
+Matrices are written a chunk of rows at a time: every text chunk is
+formatted with a single string operation instead of converting values one
+by one, and binary formats are written straight from the array buffers.
+
+Supported formats:
+
+    text  One instance per line, values separated by spaces (optional header line).
+    npy   NumPy array file with every instance as a row (see `numpy.load`).
+    raw   Bare little-endian values, row after row, with no header at all.
+"""
+
+import numpy as np
+
+# Buffer size for output files (bytes)
+BUFFER_SIZE = 1 << 20
+# Maximum rows formatted at once
+CHUNK_SIZE = 4096
+# Binary formats by file extension (anything else is text)
+FORMATS = {'.npy': 'npy', '.raw': 'raw'}
+# Bytes reserved for the .npy header (rewritten with the final shape on close)
+NPY_HEADER = 128
+
+
+class Writer:
+    """Writer for matrices of instances, one chunk at a time.
+
+    Attributes:
+        filename (str): Output file.
+        format (str): Output format ('text', 'npy' or 'raw').
+        precision (int): Significant digits of float values in text (None for
+            the shortest exact representation).
+        count (int): Number of instances written.
+    """
+
+    filename = None
+    format = None
+    precision = None
+    count = None
+
+    _file = None
+    _width = None
+    _dtype = None
+    _fmt = None
+
+    def __init__(self, filename, header=None, precision=None, format=None):
+        """Constructor.
+
+        Args:
+            filename (str): Output file.
+            header (str, optional): Defaults to None. First line of text files
+                (ignored by binary formats).
+            precision (int, optional): Defaults to None. Significant digits of
+                float values in text (None for the shortest exact representation).
+            format (str, optional): Defaults to None. Output format ('text',
+                'npy' or 'raw'; None to guess it from the file extension).
+
+        Raises:
+            ValueError: If `precision` or `format` are invalid.
+        """
+
+        # Guess format from file extension
+        if format is None:
+            format = next((f for e, f in FORMATS.items()
+                           if filename.lower().endswith(e)), 'text')
+        # Check settings
+        if format not in ('text', 'npy', 'raw'):
+            raise ValueError('Invalid output format "{}".'.format(format))
+        if precision is not None and precision < 1:
+            raise ValueError('Precision must be a positive integer.')
+        self.filename = filename
+        self.format = format
+        self.precision = precision
+        self.count = 0
+        self._file = open(filename, 'wb', buffering=BUFFER_SIZE)
+        # Leave room for the array header, or write the text one
+        if format == 'npy':
+            self._file.write(b'\0' * NPY_HEADER)
+        elif format == 'text' and header is not None:
+            self._file.write('{}\n'.format(header).encode('ascii'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _setup(self, blocks):
+        """Set row layout from the first chunk.
+
+        Args:
+            blocks (list): Matrices with the same number of rows.
+        """
+
+        self._width = sum(block.shape[1] for block in blocks)
+        # Binary values share a single type
+        self._dtype = np.result_type(*blocks).newbyteorder('<')
+        # Text values are formatted by column type
+        f = '%r' if self.precision is None else '%.{}g'.format(self.precision)
+        fmts = [('%d' if block.dtype.kind in 'biu' else f,) * block.shape[1]
+                for block in blocks]
+        self._fmt = ' '.join(x for fmt in fmts for x in fmt) + '\n'
+
+    def write(self, *blocks):
+        """Write matrices side by side, one instance per row.
+
+        Args:
+            *blocks (numpy.ndarray): Matrices with the same number of rows.
+
+        Raises:
+            ValueError: If `blocks` do not match the previous ones.
+        """
+
+        blocks = [np.asarray(b).reshape(len(b), -1) for b in blocks]
+        # Check that row counts match
+        n = len(blocks[0])
+        if any(len(b) != n for b in blocks):
+            raise ValueError('Matrices must have the same number of rows.')
+        if self._fmt is None:
+            self._setup(blocks)
+        # Check that row sizes match
+        if sum(b.shape[1] for b in blocks) != self._width:
+            raise ValueError('Row size mismatch ({}).'.format(self._width))
+        for i in range(0, n, CHUNK_SIZE):
+            chunk = [b[i:i + CHUNK_SIZE] for b in blocks]
+            if self.format == 'text':
+                # Keep integer columns apart from float ones
+                if len({b.dtype for b in chunk}) > 1:
+                    chunk = [b.astype(object) for b in chunk]
+                values = np.hstack(chunk).ravel().tolist()
+                # Format the whole chunk at once
+                text = (self._fmt * len(chunk[0])) % tuple(values)
+                self._file.write(text.encode('ascii'))
+            else:
+                self._file.write(np.hstack(chunk).astype(self._dtype).tobytes())
+        self.count += n
+
+    def _npy_header(self):
+        """Get the .npy header for the instances written.
+
+        Returns:
+            bytes: Header of `NPY_HEADER` bytes.
+        """
+
+        dtype = self._dtype if self._dtype is not None else np.dtype('<f8')
+        d = "{{'descr': '{}', 'fortran_order': False, 'shape': ({}, {}), }}".format(
+            dtype.str, self.count, self._width or 0)
+        # Pad dictionary with spaces up to the reserved size
+        d = d.ljust(NPY_HEADER - 11) + '\n'
+        return b'\x93NUMPY\x01\x00' + len(d).to_bytes(2, 'little') + d.encode('latin1')
+
+    def close(self):
+        """Flush and close the output file.
+        """
+
+        if self._file.closed:
+            return
+        # Array header needs the final shape
+        if self.format == 'npy':
+            self._file.seek(0)
+            self._file.write(self._npy_header())
+        self._file.close()
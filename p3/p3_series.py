@@ -6,8 +6,13 @@
 from time import time
 from pprint import pprint
 
-from neuro.parser import Parser, mode1, mode2, mode3, modeR
+import numpy as np
+
+from neuro.parser import Parser, mode1, mode2, mode3, modeK, modeR, holdout
 from neuro.series import Series
+from neuro.crossval import cross_validate, summary
+from neuro.predict import predict
+from neuro.writer import Writer
 
 _COURSE_ = 'NEUROCOMPUTACIÓN'
 _YEAR_ = '2017-2018'
@@ -38,26 +43,73 @@ def main():
 
     args = vars(parser.parse_args())
 
-    sizes = [int(s) for s in args['sizes']]
-    init = float(args['init'])
-    learn = float(args['learn'])
-    epochs = int(args['epochs'])
     normalize = args['normalize']
+    batch = int(args['batch'])
+    jobs = int(args['jobs']) if args['jobs'] else None
+    every = int(args['checkpoint_every'])
+    error_every = int(args['error_every'])
+    error_sample = int(args['error_sample']) if args['error_sample'] else None
+    tol = float(args['tol']) if args['tol'] else None
+    patience = int(args['patience']) if args['patience'] else None
+    max_time = float(args['max_time']) if args['max_time'] else None
+    # Training settings are not needed for a saved model
+    if not args['load']:
+        sizes = [int(s) for s in args['sizes']]
+        init = float(args['init'])
+        learn = float(args['learn'])
+        epochs = int(args['epochs'])
+
+    if args['mode'] == 'modeK':
+        sizein, sizeout, ds, folds = modeK(
+            args['data'], args['folds'], stratified=args['stratified'])
+        config = dict(sizes=sizes, init=init, learn=learn, epochs=epochs,
+                      normalize=normalize, batch_size=batch, optimizer=args['optimizer'])
+        print()
+        t0 = time()
+        stats = cross_validate(Series, config, ds, folds, jobs=jobs)
+        t = time()
+        print('Elapsed time: {0:.3f} seconds'.format(t - t0))
+        print()
+        for i, (ecm, basic) in enumerate(stats):
+            print('Fold {}: ECM = {}, Basic ECM = {}'.format(i, ecm, basic))
+        print('Statistics:')
+        print('ECM = {} ± {}'.format(*summary([s[0] for s in stats])))
+        print('Basic ECM = {} ± {}'.format(*summary([s[1] for s in stats])))
+        return
 
     if args['mode'] == 'mode1':
         sizein, sizeout, train, test = mode1(args['data'], args['ratio'])
     elif args['mode'] == 'mode2':
         sizein, sizeout, train, test = mode2(args['data'])
     elif args['mode'] == 'mode3':
-        sizein, sizeout, train, test = mode3(args['train'], args['test'])
+        sizein, sizeout, train, test = mode3(
+            args['train'], args['test'], chunk_size=args['chunk'])
     elif args['mode'] == 'modeR':
         sizein, sizeout, train, test = modeR(args['train'], args['proportion'])
 
-        p = Series('Series', sizein, sizeout, sizes)
-        p.randomize_synapses(-init, init)
+        # Hold out validation data for early stopping if required
+        validation = None
+        if args['validation'] and not args['load']:
+            train, validation = holdout(train, args['validation'])
+
+        # Load a saved model or train a new one
+        if args['load']:
+            p = Series.load(args['load'])
+        else:
+            p = Series('Series', sizein, sizeout, sizes)
+            p.randomize_synapses(-init, init)
+            p.train(train[0], train[1], learn, epochs, normalize=False,
+                    batch_size=batch, jobs=jobs or 1,
+                    checkpoint=args['checkpoint'], checkpoint_every=every,
+                    resume=args['resume'], error=args['error'],
+                    error_every=error_every, error_sample=error_sample,
+                    validation=validation, tol=tol, patience=patience, max_time=max_time,
+                    optimizer=args['optimizer'])
+        if args['save']:
+            p.save(args['save'])
+            print('Model was saved to \'{}\'.'.format(args['save']))
 
         n_recursive = int(args['n_epochs'])
-        p.train(train[0], train[1], learn, epochs, normalize=False)
         prediction_r, prediction = p.predict_recursive(test[0], n_recursive)
 
         # Write the results to a file
@@ -75,31 +127,56 @@ def main():
             file_out.writelines('\n')
         return
 
-    p = Series('Series', sizein, sizeout, sizes)
-    p.randomize_synapses(-init, init)
+    # Hold out validation data for early stopping if required
+    validation = None
+    if args['validation'] and not args['load']:
+        train, validation = holdout(train, args['validation'])
+
+    # Load a saved model or train a new one
+    if args['load']:
+        p = Series.load(args['load'])
+        print('Model was loaded from \'{}\'.'.format(args['load']))
+        print()
+    else:
+        p = Series('Series', sizein, sizeout, sizes)
+        p.randomize_synapses(-init, init)
 
-    print()
-    t0 = time()
-    p.train(train[0], train[1], learn, epochs, normalize=normalize)
-    t = time()
-    print()
-    print('Elapsed time: {0:.3f} seconds'.format(t - t0))
-    print()
+        print()
+        t0 = time()
+        p.train(train[0], train[1], learn, epochs, normalize=normalize,
+                batch_size=batch, jobs=jobs or 1,
+                checkpoint=args['checkpoint'], checkpoint_every=every,
+                resume=args['resume'], error=args['error'],
+                error_every=error_every, error_sample=error_sample,
+                validation=validation, tol=tol, patience=patience, max_time=max_time,
+                optimizer=args['optimizer'])
+        t = time()
+        print()
+        print('Elapsed time: {0:.3f} seconds'.format(t - t0))
+        print()
+    if args['save']:
+        p.save(args['save'])
+        print('Model was saved to \'{}\'.'.format(args['save']))
 
 
-    ecm, basic = p.stats(test[0], test[1])
+    if args['mode'] == 'mode3':
+        # Predict test instances chunk by chunk, accumulating statistics
+        n, ecm, basic = 0, 0.0, 0.0
+        precision = int(args['precision']) if args['precision'] else None
+        with Writer(args['output'], precision=precision) as file_out:
+            for x, t, results in predict(p, test):
+                file_out.write(results.reshape(-1, 1))
+                n += len(results)
+                ecm += np.sum((t - results) ** 2)
+                basic += np.sum((t - x[:, -1:]) ** 2)
+        ecm, basic = ecm / n, basic / n
+    else:
+        ecm, basic = p.stats(test[0], test[1])
 
     print('Statistics:')
     print('ECM = ', ecm)
     print('Basic ECM = ', basic)
 
-    if args['mode'] == 'mode3':
-        with open(args['output'], 'w') as file_out:
-            results = p.test(test[0])
-            for r in results:
-                for x in r:
-                    file_out.write(str(x) + '\n')
-
 
 if __name__ == "__main__":
     main()
@@ -1,5 +1,7 @@
 import numpy as np
 
+from neuro.writer import Writer
+
 
 class SeriesAdapter:
 
@@ -28,11 +30,9 @@ class SeriesAdapter:
 
         self._data = data.T
 
-    def export(self, filename):
-
-        with open(filename, 'w') as file:
+    def export(self, filename, precision=None):
 
-            file.write('{} {}'.format(self._na, self._ns) + '\n')
+        with Writer(filename, header='{} {}'.format(self._na, self._ns),
+                    precision=precision) as file:
 
-            for v in self._data:
-                file.write(' '.join(v.astype(str)) + '\n')
+            file.write(self._data)
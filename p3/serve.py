@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Inference server program.
+"""
+
+from argparse import ArgumentParser, RawTextHelpFormatter
+
+from neuro.base import store
+from neuro.ml_perceptron import MLPerceptron
+from neuro.autoencoder import Autoencoder
+from neuro.series import Series
+from neuro.server import InferenceServer
+
+_COURSE_ = 'NEUROCOMPUTACIÓN'
+_YEAR_ = '2017-2018'
+_TITLE_ = 'Práctica 3: Servidor de predicciones'
+_PAIR_ = 'Pareja 08'
+_AUTHORS_ = ['Sergio Fuentes', 'Adrián Muñoz']
+
+# Net classes that can be served
+_CLASSES_ = {cls.__name__: cls for cls in (MLPerceptron, Autoencoder, Series)}
+
+
+def build_parser():
+    """Build the argument parser.
+
+    Returns:
+        ArgumentParser: Parser.
+    """
+
+    desc = (
+        '{} {}\n'
+        '{}\n'
+        '{}: {}'
+    ).format(_COURSE_, _YEAR_, _TITLE_, _PAIR_, ', '.join(_AUTHORS_))
+    parser = ArgumentParser(description=desc,
+                            formatter_class=RawTextHelpFormatter)
+    parser.add_argument(
+        '-L', '--load', help='saved model to serve', required=True)
+    parser.add_argument(
+        '-H', '--host', help='address to listen on (default: 127.0.0.1)', default='127.0.0.1')
+    parser.add_argument(
+        '-p', '--port', help='port to listen on (default: 8000)', default='8000')
+    parser.add_argument(
+        '-b', '--batch', help='maximum instances per batch (default: 64)', default='64')
+    parser.add_argument(
+        '-d', '--delay', help='maximum milliseconds a request waits for a batch (default: 5)', default='5')
+
+    return parser
+
+
+def main():
+    """Main function.
+    """
+
+    args = vars(build_parser().parse_args())
+
+    # Pick the net class saved in the model file
+    header, _ = store.read(args['load'])
+    if header['cls'] not in _CLASSES_:
+        raise ValueError('Cannot serve nets of class {}.'.format(header['cls']))
+    net = _CLASSES_[header['cls']].load(args['load'])
+
+    server = InferenceServer(net, args['host'], int(args['port']),
+                             int(args['batch']), float(args['delay']) / 1000)
+    print('Serving {} \'{}\' on http://{}:{}/ (POST /predict, GET /stats)'.format(
+        header['cls'], net.name, *server.server_address[:2]), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+    finally:
+        server.server_close()
+    print('Statistics:', server.batcher.stats())
+
+
+if __name__ == "__main__":
+    main()